@@ -1,30 +1,44 @@
 import numpy as np
 from scipy.stats import chi2
-from svgwrite import Drawing, rgb
+from svgwrite import rgb
+from tick_table import TickTableBuilder, table_to_svg
 import math
 
-def generate_chi2_distribution_slide_rule(output_file="chi2_distribution_slide_rule_enhanced005.svg"):
-    # === CONFIGURABLE LINES: Define your 4 degrees of freedom here ===
-    df1 = 7    # ✅ CHANGE THIS VALUE AS NEEDED
-    df2 = 14   # ✅ CHANGE THIS VALUE AS NEEDED
-    df3 = 28   # ✅ CHANGE THIS VALUE AS NEEDED
-    df4 = 35   # ✅ CHANGE THIS VALUE AS NEEDED
-    
-    # Create list from these 4 variables
-    dfs = [df1, df2, df3, df4]
-    
+# === CONFIGURABLE DEFAULTS: any key can be overridden by passing a spec dict ===
+CHI2_RULE_DEFAULTS = {
+    "dfs": (7, 14, 28, 35),  # ✅ CHANGE THESE VALUES AS NEEDED (one scale per df)
+    "width": 1800,
+    "height": 800,
+    "margin": 80,
+    "p_display_min": 0.001,
+    "p_display_max": 0.999,
+}
+
+
+def build_chi2_distribution_tick_table(spec=None):
+    # Builds the whole rule as a TickTable from spec only: no globals, no printing, no file access
+    spec = {**CHI2_RULE_DEFAULTS, **(spec or {})}
+    dfs = list(spec["dfs"])
+    if not dfs:
+        raise ValueError("spec['dfs'] needs at least one degrees-of-freedom value")
+
     # Configuration
-    width, height = 1800, 800
-    margin = 80
+    width, height = spec["width"], spec["height"]
+    margin = spec["margin"]
     rule_width = width - 2 * margin
 
     # Adjusted probability display range for chi-square (right-tailed)
-    P_DISPLAY_MIN, P_DISPLAY_MAX = 0.001, 0.999
+    P_DISPLAY_MIN, P_DISPLAY_MAX = spec["p_display_min"], spec["p_display_max"]
     P_LOGIT_MIN, P_LOGIT_MAX = 0.0005, 0.9995
 
-    # Create SVG drawing
-    dwg = Drawing(output_file, size=(width, height), profile='full')
-    dwg.add(dwg.rect(insert=(0, 0), size=(width, height), fill=rgb(248, 248, 240)))
+    # Fixed vertical positions, one df line every 100 px
+    prob_y = 150
+    chi2_y_positions = [250 + 100 * i for i in range(len(dfs))]
+    height = max(height, chi2_y_positions[-1] + 250)
+
+    # Collect ticks and labels in a columnar tick table
+    table = TickTableBuilder(width, height)
+    table.add_decor("rect", insert=(0, 0), size=(width, height), fill=rgb(248, 248, 240))
 
     # Logit-based position mapping
     def p_to_position_logit(p):
@@ -40,39 +54,20 @@ def generate_chi2_distribution_slide_rule(output_file="chi2_distribution_slide_r
 
     p_to_position = p_to_position_logit
 
-    # Fixed vertical positions for 4 df lines
-    prob_y = 150
-    chi2_y_positions = [250, 350, 450, 550]  # Fixed for df1, df2, df3, df4
-    
-    # Fixed colors for 4 df lines
+    # Colors cycle for the df lines
     chi2_colors = [rgb(255, 0, 0), rgb(0, 128, 0), rgb(0, 0, 255), rgb(128, 0, 128)]  # Red, Green, Blue, Purple
+    chi2_colors = [chi2_colors[i % len(chi2_colors)] for i in range(len(dfs))]
 
     # Draw probability baseline
-    dwg.add(dwg.line(start=(margin, prob_y), end=(width - margin, prob_y),
-                     stroke=rgb(0, 0, 0), stroke_width=2))
-    dwg.add(dwg.text("Probability (P) - Right Tail", insert=(width/2, prob_y - 30), text_anchor="middle",
-                     font_size=12, font_family="Arial", fill=rgb(0, 0, 0)))
-
-    # Draw chi-square distribution baselines - using df1, df2, df3, df4 explicitly
-    dwg.add(dwg.line(start=(margin, chi2_y_positions[0]), end=(width - margin, chi2_y_positions[0]),
-                     stroke=chi2_colors[0], stroke_width=2))
-    dwg.add(dwg.text(f"Chi-square distribution (df={df1})", insert=(width/2, chi2_y_positions[0] - 30), 
-                     text_anchor="middle", font_size=12, font_family="Arial", fill=chi2_colors[0]))
-
-    dwg.add(dwg.line(start=(margin, chi2_y_positions[1]), end=(width - margin, chi2_y_positions[1]),
-                     stroke=chi2_colors[1], stroke_width=2))
-    dwg.add(dwg.text(f"Chi-square distribution (df={df2})", insert=(width/2, chi2_y_positions[1] - 30), 
-                     text_anchor="middle", font_size=12, font_family="Arial", fill=chi2_colors[1]))
-
-    dwg.add(dwg.line(start=(margin, chi2_y_positions[2]), end=(width - margin, chi2_y_positions[2]),
-                     stroke=chi2_colors[2], stroke_width=2))
-    dwg.add(dwg.text(f"Chi-square distribution (df={df3})", insert=(width/2, chi2_y_positions[2] - 30), 
-                     text_anchor="middle", font_size=12, font_family="Arial", fill=chi2_colors[2]))
-
-    dwg.add(dwg.line(start=(margin, chi2_y_positions[3]), end=(width - margin, chi2_y_positions[3]),
-                     stroke=chi2_colors[3], stroke_width=2))
-    dwg.add(dwg.text(f"Chi-square distribution (df={df4})", insert=(width/2, chi2_y_positions[3] - 30), 
-                     text_anchor="middle", font_size=12, font_family="Arial", fill=chi2_colors[3]))
+    table.add_decor("line", start=(margin, prob_y), end=(width - margin, prob_y),
+                    stroke=rgb(0, 0, 0), stroke_width=2)
+    table.add_label("P", "Probability (P) - Right Tail", width/2, prob_y - 30, 12, rgb(0, 0, 0))
+
+    # Draw chi-square distribution baselines
+    for df, y_pos, color in zip(dfs, chi2_y_positions, chi2_colors):
+        table.add_decor("line", start=(margin, y_pos), end=(width - margin, y_pos),
+                        stroke=color, stroke_width=2)
+        table.add_label(f"chi2 df={df}", f"Chi-square distribution (df={df})", width/2, y_pos - 30, 12, color)
 
     # Probability ticks (using right-tail probabilities for chi-square)
     def add_probability_ticks():
@@ -87,13 +82,10 @@ def generate_chi2_distribution_slide_rule(output_file="chi2_distribution_slide_r
                 tick_size, stroke_width, font_size = 12, 1.5, 9
             else:
                 tick_size, stroke_width, font_size = 8, 1.0, 8
-            dwg.add(dwg.line(start=(x_pos, prob_y), end=(x_pos, prob_y - tick_size),
-                             stroke=rgb(0, 0, 0), stroke_width=stroke_width))
+            tick = table.add_tick("P", x_pos, prob_y, -tick_size, rgb(0, 0, 0), stroke_width)
             if p >= 0.1 and p <= 0.9 or p in [0.001, 0.005, 0.01, 0.025, 0.05, 0.95, 0.975, 0.99, 0.995, 0.999]:
                 label = f"{p:.3f}" if (p < 0.1 or p > 0.9) else f"{p:.2f}"
-                dwg.add(dwg.text(label, insert=(x_pos, prob_y - tick_size - 10), 
-                                 text_anchor="middle", font_size=font_size, 
-                                 font_family="Arial", fill=rgb(0, 0, 0)))
+                table.add_label("P", label, x_pos, prob_y - tick_size - 10, font_size, rgb(0, 0, 0), tick=tick)
 
     def add_probability_minor_ticks():
         main_probs = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.975, 0.99, 0.995, 0.999]
@@ -107,19 +99,18 @@ def generate_chi2_distribution_slide_rule(output_file="chi2_distribution_slide_r
                     p_minor = p1 + j * step
                     if P_DISPLAY_MIN <= p_minor <= P_DISPLAY_MAX:
                         x_pos = p_to_position(p_minor)
-                        dwg.add(dwg.line(start=(x_pos, prob_y), end=(x_pos, prob_y - 6),
-                                         stroke=rgb(0, 0, 0), stroke_width=0.7))
+                        table.add_tick("P", x_pos, prob_y, -6, rgb(0, 0, 0), 0.7)
             else:
                 step = (p2 - p1) / 4
                 for j in range(1, 4):
                     p_minor = p1 + j * step
                     if P_DISPLAY_MIN <= p_minor <= P_DISPLAY_MAX:
                         x_pos = p_to_position(p_minor)
-                        dwg.add(dwg.line(start=(x_pos, prob_y), end=(x_pos, prob_y - 4),
-                                         stroke=rgb(0, 0, 0), stroke_width=0.5))
+                        table.add_tick("P", x_pos, prob_y, -4, rgb(0, 0, 0), 0.5)
 
     # === COMPREHENSIVE CHI-SQUARE TICKS FUNCTION WITH ALL DECIMAL MARKS ===
     def add_chi2_ticks(degrees_of_freedom, y_pos, color):
+        scale = f"chi2 df={degrees_of_freedom}"
         # Determine chi-square range that maps to visible probability range
         try:
             min_chi2 = chi2.ppf(1 - P_DISPLAY_MAX, degrees_of_freedom)
@@ -160,11 +151,8 @@ def generate_chi2_distribution_slide_rule(output_file="chi2_distribution_slide_r
             # Format label as integer
             chi2_label = f"{chi2_val:.0f}"
             
-            dwg.add(dwg.line(start=(x_pos, y_pos), end=(x_pos, y_pos + tick_size),
-                             stroke=color, stroke_width=stroke_width))
-            dwg.add(dwg.text(chi2_label, insert=(x_pos, y_pos + tick_size + 14), 
-                             text_anchor="middle", font_size=font_size, 
-                             font_family="Arial", fill=color))
+            tick = table.add_tick(scale, x_pos, y_pos, tick_size, color, stroke_width)
+            table.add_label(scale, chi2_label, x_pos, y_pos + tick_size + 14, font_size, color, tick=tick)
         
         # === ADD DECIMAL TICKS EVERY 0.1 UNITS FOR FULL COVERAGE ===
         # Generate all possible decimal ticks in the range
@@ -182,8 +170,7 @@ def generate_chi2_distribution_slide_rule(output_file="chi2_distribution_slide_r
                     
                     # Add a small tick for the decimal
                     tick_height = 5
-                    dwg.add(dwg.line(start=(x_pos, y_pos), end=(x_pos, y_pos + tick_height),
-                                     stroke=color, stroke_width=0.6))
+                    table.add_tick(scale, x_pos, y_pos, tick_height, color, 0.6)
             
             current += 1
         
@@ -208,91 +195,80 @@ def generate_chi2_distribution_slide_rule(output_file="chi2_distribution_slide_r
                     x_pos = p_to_position(p_val)
                     
                     # Add very fine 0.01 mark
-                    dwg.add(dwg.line(start=(x_pos, y_pos), end=(x_pos, y_pos + 3),
-                                     stroke=color, stroke_width=0.3))
+                    table.add_tick(scale, x_pos, y_pos, 3, color, 0.3)
                 current += 0.01  # 0.01 increments for extreme precision
 
-    # Add all ticks - using df1, df2, df3, df4 explicitly
-    add_chi2_ticks(df1, chi2_y_positions[0], chi2_colors[0])
-    add_chi2_ticks(df2, chi2_y_positions[1], chi2_colors[1])
-    add_chi2_ticks(df3, chi2_y_positions[2], chi2_colors[2])
-    add_chi2_ticks(df4, chi2_y_positions[3], chi2_colors[3])
+    # Add all ticks
+    for df, y_pos, color in zip(dfs, chi2_y_positions, chi2_colors):
+        add_chi2_ticks(df, y_pos, color)
 
     # Add probability ticks
     add_probability_ticks()
     add_probability_minor_ticks()
 
     # Title and info
-    dwg.add(dwg.text("Enhanced Chi-Square Distribution Slide Rule", insert=(width/2, 60), text_anchor="middle",
-                     font_size=18, font_family="Arial", font_weight="bold", fill=rgb(0, 0, 0)))
-    dwg.add(dwg.text("Right-Tail Probabilities with Warped Chi-Square Scales", 
-                     insert=(width/2, 90), text_anchor="middle",
-                     font_size=12, font_family="Arial", fill=rgb(100, 100, 100)))
-
-    explanation_y = chi2_y_positions[3] + 80  # Using df4's y position
-    dwg.add(dwg.text("How to use: Align right-tail probability on top scale with corresponding chi-square value on any chi-square scale", 
-                     insert=(width/2, explanation_y), text_anchor="middle",
-                     font_size=10, font_family="Arial", fill=rgb(80, 80, 80)))
-    dwg.add(dwg.text("Expanded extremes for higher precision in tail probabilities (important for hypothesis testing)", 
-                     insert=(width/2, explanation_y + 20), text_anchor="middle",
-                     font_size=10, font_family="Arial", fill=rgb(80, 80, 80)))
-
-    # Legend - using df1, df2, df3, df4 explicitly
+    table.add_label("title", "Enhanced Chi-Square Distribution Slide Rule", width/2, 60, 18, rgb(0, 0, 0),
+                    font_weight="bold")
+    table.add_label("title", "Right-Tail Probabilities with Warped Chi-Square Scales",
+                    width/2, 90, 12, rgb(100, 100, 100))
+
+    explanation_y = chi2_y_positions[-1] + 80  # Using the last df's y position
+    table.add_label("title", "How to use: Align right-tail probability on top scale with corresponding chi-square value on any chi-square scale",
+                    width/2, explanation_y, 10, rgb(80, 80, 80))
+    table.add_label("title", "Expanded extremes for higher precision in tail probabilities (important for hypothesis testing)",
+                    width/2, explanation_y + 20, 10, rgb(80, 80, 80))
+
+    # Legend
     legend_x = margin
-    legend_y = chi2_y_positions[3] + 120  # Using df4's y position
-    dwg.add(dwg.circle(center=(legend_x, legend_y), r=5, fill=chi2_colors[0]))
-    dwg.add(dwg.text(f"df = {df1}", insert=(legend_x + 15, legend_y + 5), 
-                     font_size=10, font_family="Arial", fill=chi2_colors[0]))
-    
-    legend_x += 120
-    dwg.add(dwg.circle(center=(legend_x, legend_y), r=5, fill=chi2_colors[1]))
-    dwg.add(dwg.text(f"df = {df2}", insert=(legend_x + 15, legend_y + 5), 
-                     font_size=10, font_family="Arial", fill=chi2_colors[1]))
-    
-    legend_x += 120
-    dwg.add(dwg.circle(center=(legend_x, legend_y), r=5, fill=chi2_colors[2]))
-    dwg.add(dwg.text(f"df = {df3}", insert=(legend_x + 15, legend_y + 5), 
-                     font_size=10, font_family="Arial", fill=chi2_colors[2]))
-    
-    legend_x += 120
-    dwg.add(dwg.circle(center=(legend_x, legend_y), r=5, fill=chi2_colors[3]))
-    dwg.add(dwg.text(f"df = {df4}", insert=(legend_x + 15, legend_y + 5), 
-                     font_size=10, font_family="Arial", fill=chi2_colors[3]))
+    legend_y = chi2_y_positions[-1] + 120  # Using the last df's y position
+    for df, color in zip(dfs, chi2_colors):
+        table.add_decor("circle", center=(legend_x, legend_y), r=5, fill=color)
+        table.add_label("legend", f"df = {df}", legend_x + 15, legend_y + 5, 10, color, text_anchor="start")
+        legend_x += 120
 
     # Bounding box
-    rule_box = dwg.rect(insert=(margin-10, prob_y-40), size=(rule_width+20, chi2_y_positions[3] - prob_y + 180),
-                        fill="none", stroke=rgb(200, 200, 200), stroke_width=1.5, rx=6, ry=6)
-    dwg.add(rule_box)
+    table.add_decor("rect", insert=(margin-10, prob_y-40), size=(rule_width+20, chi2_y_positions[-1] - prob_y + 180),
+                    fill="none", stroke=rgb(200, 200, 200), stroke_width=1.5, rx=6, ry=6)
 
     # Fix right-hand side emptiness by adding a vertical line and extending the probability scale
-    dwg.add(dwg.line(start=(width - margin, prob_y), end=(width - margin, chi2_y_positions[3] + 100),
-                     stroke=rgb(0, 0, 0), stroke_width=1.5))
+    table.add_decor("line", start=(width - margin, prob_y), end=(width - margin, chi2_y_positions[-1] + 100),
+                    stroke=rgb(0, 0, 0), stroke_width=1.5)
     
     # Add a small label at the far right to indicate the end of the scale
-    dwg.add(dwg.text("End", insert=(width - margin - 15, chi2_y_positions[3] + 120),
-                     font_size=10, font_family="Arial", fill=rgb(0, 0, 0), text_anchor="end"))
+    table.add_label("legend", "End", width - margin - 15, chi2_y_positions[-1] + 120, 10, rgb(0, 0, 0),
+                    text_anchor="end")
     
     # Also extend the probability scale slightly to make it more visually balanced
-    dwg.add(dwg.line(start=(margin, prob_y), end=(width - margin - 10, prob_y),
-                     stroke=rgb(0, 0, 0), stroke_width=2))
+    table.add_decor("line", start=(margin, prob_y), end=(width - margin - 10, prob_y),
+                    stroke=rgb(0, 0, 0), stroke_width=2)
+
+    return table.build()
+
 
-    dwg.save()
+def render_chi2_distribution_slide_rule(spec=None):
+    # Pure and reentrant: returns the SVG document as bytes, safe to call from many threads
+    return table_to_svg(build_chi2_distribution_tick_table(spec))
+
+
+def write_chi2_distribution_slide_rule(stream, spec=None):
+    # Writes the SVG to any binary stream (file, socket, BytesIO, HTTP response body)
+    stream.write(render_chi2_distribution_slide_rule(spec))
+
+
+def generate_chi2_distribution_slide_rule(output_file="chi2_distribution_slide_rule_enhanced005.svg", spec=None):
+    spec = {**CHI2_RULE_DEFAULTS, **(spec or {})}
+    with open(output_file, "wb") as f:
+        write_chi2_distribution_slide_rule(f, spec)
     print(f"Enhanced Chi-square distribution slide rule saved as {output_file}")
-    print(f"Created with degrees of freedom: df1={df1}, df2={df2}, df3={df3}, df4={df4}")
+    print(f"Created with degrees of freedom: {', '.join(str(df) for df in spec['dfs'])}")
     print("Probability scale uses right-tail probabilities (1 - CDF)")
     print("Chi-square scales now feature comprehensive decimal marking")
 
 def generate_custom_chi2_slide_rule(df1=5, df2=12, df3=30, df4=100, output_file="custom_chi2_slide_rule_enhanced.svg"):
     # Wrapper function to allow passing df values as parameters
-    import types
-    def temp_func(output_file=output_file):
-        # Use the same configurable lines approach
-        globals()['df1'], globals()['df2'], globals()['df3'], globals()['df4'] = df1, df2, df3, df4
-        generate_chi2_distribution_slide_rule(output_file)
-    
-    temp_func(output_file)
+    generate_chi2_distribution_slide_rule(output_file, spec={"dfs": (df1, df2, df3, df4)})
 
 
 if __name__ == "__main__":
-    # This is the ONLY place you need to change df values
+    # Change df values in CHI2_RULE_DEFAULTS at the top of this file
     generate_chi2_distribution_slide_rule()
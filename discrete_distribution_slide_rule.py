@@ -0,0 +1,120 @@
+import numpy as np
+from scipy.stats import binom, poisson
+from svgwrite import rgb
+from tick_table import TickTableBuilder, table_to_svg
+from probability_scale import (P_DISPLAY_MIN, P_DISPLAY_MAX, MIN_TICK_SPACING, logit_p_to_position,
+                               add_probability_scale, nice_strides, add_dense_bands)
+
+MIN_LABEL_SPACING = 28.0
+# 1-2-5 strides in whole k
+NICE_STEPS = np.array([1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000])
+
+
+# === CONFIGURABLE DEFAULTS: any key can be overridden by passing a spec dict ===
+DISCRETE_RULE_DEFAULTS = {
+    "binomial_rows": ((20, 0.5), (200, 0.3), (100000, 0.5)),  # (n, p) per row
+    "poisson_rows": (4, 25, 10000),                           # mu per row
+}
+
+
+def build_discrete_distribution_tick_table(spec=None):
+    # Builds the whole rule as a TickTable from spec only: no globals, no printing, no file access
+    spec = {**DISCRETE_RULE_DEFAULTS, **(spec or {})}
+    binomial_rows, poisson_rows = spec["binomial_rows"], spec["poisson_rows"]
+    rows = [(f"Binomial (n={n}, p={p_success:g})", binom(n, p_success)) for n, p_success in binomial_rows]
+    rows += [(f"Poisson (mu={mu:g})", poisson(mu)) for mu in poisson_rows]
+    if not rows:
+        raise ValueError("spec needs at least one binomial or Poisson row")
+
+    # Configuration
+    width = 1800
+    margin = 80
+    rule_width = width - 2 * margin
+    prob_y = 150
+    row_y_positions = [250 + i * 100 for i in range(len(rows))]
+    height = row_y_positions[-1] + 160
+
+    # Collect ticks and labels in a columnar tick table
+    table = TickTableBuilder(width, height)
+    table.add_decor("rect", insert=(0, 0), size=(width, height), fill=rgb(248, 248, 240))
+
+    # Vectorized logit position mapping
+    p_to_position = logit_p_to_position(margin, rule_width)
+
+    row_colors = [rgb(255, 0, 0), rgb(0, 128, 0), rgb(0, 0, 255), rgb(128, 0, 128),
+                  rgb(200, 100, 0), rgb(0, 128, 128)]
+
+    # Draw probability baseline and ticks
+    add_probability_scale(table, p_to_position, prob_y, margin, width, "Cumulative Probability P(X <= k)")
+
+    # === DISCRETE TICKS: one batched CDF call per row, thinned to the pixel resolution ===
+    def add_discrete_ticks(scale, dist, y_pos, color):
+        # Only the k range that lands on the visible probability scale
+        k_lo = int(max(dist.ppf(P_DISPLAY_MIN) - 1, dist.support()[0]))
+        k_hi = int(min(dist.ppf(P_DISPLAY_MAX), dist.support()[1]))
+        k = np.arange(k_lo, k_hi + 1)
+        cdf = dist.cdf(k)
+        visible = (cdf >= P_DISPLAY_MIN) & (cdf <= P_DISPLAY_MAX)
+        k, cdf = k[visible], cdf[visible]
+        if len(k) == 0:
+            return
+        x = p_to_position(cdf)
+
+        # Local pixel distance between neighbouring k values decides the stride there
+        stride = nice_strides(x, MIN_TICK_SPACING, NICE_STEPS)
+        keep = (k % stride) == 0
+        # Labels can only sit on drawn ticks, so never finer than the tick stride
+        label_stride = np.maximum(nice_strides(x, MIN_LABEL_SPACING, NICE_STEPS), stride)
+
+        # Aggregated bands where individual k steps are below the pixel resolution
+        add_dense_bands(table, x, stride > 1, y_pos, color)
+
+        # Unlabeled ticks go in as one batch, labeled ones keep their label link
+        is_labeled = (k % label_stride) == 0
+        table.add_ticks(scale, x[keep & ~is_labeled], y_pos, 6, color, 0.7)
+        last_label_pos = -1e9
+        for idx in np.flatnonzero(keep & is_labeled):
+            x_pos = float(x[idx])
+            tick = table.add_tick(scale, x_pos, y_pos, 12, color, 1.5)
+            if abs(x_pos - last_label_pos) > MIN_LABEL_SPACING:
+                table.add_label(scale, f"{k[idx]}", x_pos, y_pos + 24, 9, color, tick=tick)
+                last_label_pos = x_pos
+
+    for row, ((title, dist), y_pos) in enumerate(zip(rows, row_y_positions)):
+        color = row_colors[row % len(row_colors)]
+        table.add_decor("line", start=(margin, y_pos), end=(width - margin, y_pos), stroke=color, stroke_width=2)
+        table.add_label(title, title, width/2, y_pos - 30, 12, color)
+        add_discrete_ticks(title, dist, y_pos, color)
+
+    # Title and info
+    table.add_label("title", "Discrete Distribution Slide Rule", width/2, 60, 18, rgb(0, 0, 0),
+                    font_weight="bold")
+    table.add_label("title", "Binomial and Poisson scales, shaded bands mark k steps too dense to draw one by one",
+                    width/2, 90, 12, rgb(100, 100, 100))
+
+    # Bounding box
+    table.add_decor("rect", insert=(margin-10, prob_y-40), size=(rule_width+20, row_y_positions[-1] - prob_y + 100),
+                    fill="none", stroke=rgb(200, 200, 200), stroke_width=1.5, rx=6, ry=6)
+
+    return table.build()
+
+
+def render_discrete_distribution_slide_rule(spec=None):
+    # Pure and reentrant: returns the SVG document as bytes, safe to call from many threads
+    return table_to_svg(build_discrete_distribution_tick_table(spec))
+
+
+def write_discrete_distribution_slide_rule(stream, spec=None):
+    stream.write(render_discrete_distribution_slide_rule(spec))
+
+
+def generate_discrete_distribution_slide_rule(output_file="discrete_distribution_slide_rule.svg", spec=None):
+    spec = {**DISCRETE_RULE_DEFAULTS, **(spec or {})}
+    with open(output_file, "wb") as f:
+        write_discrete_distribution_slide_rule(f, spec)
+    print(f"Discrete distribution slide rule saved as {output_file}")
+    print(f"Rows: binomial {list(spec['binomial_rows'])}, poisson {list(spec['poisson_rows'])}")
+
+
+if __name__ == "__main__":
+    generate_discrete_distribution_slide_rule()
@@ -0,0 +1,287 @@
+import numpy as np
+from scipy.stats import norm
+from svgwrite import rgb
+from concurrent.futures import ProcessPoolExecutor
+from tick_table import TickTableBuilder, table_to_svg
+from probability_scale import P_DISPLAY_MIN, P_DISPLAY_MAX, logit_p_to_position, add_probability_scale
+import math
+import os
+import sys
+
+# Rows parsed per chunk: bounds memory per worker independently of the file size
+CHUNK_ROWS = 1_000_000
+
+
+class TDigest:
+    # Mergeable t-digest (Dunning & Ertl 2019) with a logit scale function: each centroid covers at
+    # most 1 / resolution of logit(q). The rank error is therefore relative to min(q, 1 - q), i.e. the
+    # same number of pixels anywhere on the logit probability scale, 0.001 tail included. The ~20
+    # most extreme values at each end stay single, exact centroids.
+    # Memory is about 2 * resolution * log(n) centroids.
+
+    def __init__(self, resolution=20):
+        self.resolution = resolution
+        self.n = 0
+        self._mean = 0.0        # running mean / sum of squared deviations for the normal reference row
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return self
+        batch_mean = float(values.mean())
+        self._add_moments(len(values), batch_mean, float(np.sum((values - batch_mean) ** 2)))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._absorb(values, np.ones(len(values)))
+        return self
+
+    def _add_moments(self, n, mean, m2):
+        # Chan et al. parallel update of (n, mean, M2): stable where sum / sum of squares cancels
+        total = self.n + n
+        delta = mean - self._mean
+        self._mean += delta * n / total
+        self._m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+
+    def _absorb(self, means, weights):
+        # Sort old centroids and new points together, then merge every run that falls in the
+        # same 1 / resolution bin of logit(q), q taken at each centroid's centre
+        means = np.concatenate((self.means, means))
+        weights = np.concatenate((self.weights, weights))
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        cum_weights = np.cumsum(weights)
+        q = (cum_weights - weights / 2) / cum_weights[-1]
+        bins = np.floor(np.log(q / (1 - q)) * self.resolution)
+        starts = np.flatnonzero(np.concatenate(([True], bins[1:] != bins[:-1])))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def merge(self, other):
+        if other.resolution != self.resolution:
+            raise ValueError(f"Cannot merge digests with resolution {self.resolution} and {other.resolution}")
+        if other.n:
+            self._add_moments(other.n, other._mean, other._m2)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._absorb(other.means, other.weights)
+        return self
+
+    def _rank_points(self):
+        # Piecewise-linear rank curve through the centroid centres, pinned at min and max
+        cum_weights = np.cumsum(self.weights)
+        values = np.concatenate(([self.min], self.means, [self.max]))
+        ranks = np.concatenate(([0.0], cum_weights - self.weights / 2, [cum_weights[-1]]))
+        return values, ranks
+
+    def cdf(self, x):
+        # Estimated P(X <= x), vectorized over x
+        values, ranks = self._rank_points()
+        return np.interp(np.asarray(x, dtype=np.float64), values, ranks) / ranks[-1]
+
+    def quantile(self, q):
+        values, ranks = self._rank_points()
+        return np.interp(np.asarray(q, dtype=np.float64) * ranks[-1], ranks, values)
+
+    @property
+    def mean(self):
+        return self._mean
+
+    @property
+    def std(self):
+        return math.sqrt(self._m2 / self.n)
+
+
+def _parse_column(lines, column, delimiter):
+    values = np.empty(len(lines), dtype=np.float64)
+    for i, line in enumerate(lines):
+        try:
+            values[i] = float(line.split(delimiter)[column])
+        except (ValueError, IndexError):
+            values[i] = np.nan  # header, blank or malformed row: dropped by update()
+    return values
+
+
+def _sketch_csv_range(path, start, end, column, delimiter, resolution):
+    # Sketch the rows whose first byte lies in [start, end) of a CSV file (runs in a worker process)
+    sketch = TDigest(resolution)
+    with open(path, "rb") as f:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()  # finish the line that straddles the boundary, it belongs to the previous range
+        lines = []
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            lines.append(line.decode("utf-8", "replace"))
+            if len(lines) >= CHUNK_ROWS:
+                sketch.update(_parse_column(lines, column, delimiter))
+                lines = []
+        sketch.update(_parse_column(lines, column, delimiter))
+    return sketch
+
+
+def _sketch_npy_range(path, start, end, column, resolution):
+    data = np.load(path, mmap_mode="r")
+    sketch = TDigest(resolution)
+    for chunk_start in range(start, end, CHUNK_ROWS):
+        chunk = data[chunk_start:min(chunk_start + CHUNK_ROWS, end)]
+        sketch.update(chunk[:, column] if chunk.ndim == 2 else chunk)
+    return sketch
+
+
+def sketch_sources(sources, column=0, delimiter=",", resolution=20, max_workers=None):
+    # Build one merged t-digest from CSV / .npy paths and / or NumPy chunks, in any mix.
+    # Files are cut into byte (CSV) or row (.npy) ranges that are sketched in parallel and merged;
+    # array chunks go straight into the digest.
+    if isinstance(sources, (str, os.PathLike, np.ndarray)):
+        sources = [sources]
+
+    workers = max_workers or os.cpu_count() or 1
+    sketch = TDigest(resolution)
+    jobs = []
+    for source in sources:
+        if not isinstance(source, (str, os.PathLike)):
+            sketch.update(source)
+            continue
+        path = os.fspath(source)
+        if path.endswith(".npy"):
+            n_rows = np.load(path, mmap_mode="r").shape[0]
+            bounds = np.linspace(0, n_rows, workers + 1).astype(int)
+            jobs += [(_sketch_npy_range, (path, int(a), int(b), column)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+        else:
+            size = os.path.getsize(path)
+            bounds = np.linspace(0, size, workers + 1).astype(int)
+            jobs += [(_sketch_csv_range, (path, int(a), int(b), column, delimiter)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    if workers == 1 or len(jobs) <= 1:
+        for func, args in jobs:
+            sketch.merge(func(*args, resolution))
+        return sketch
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(func, *args, resolution) for func, args in jobs]
+        for future in futures:
+            sketch.merge(future.result())
+    return sketch
+
+
+def _nice_step(span, target_ticks):
+    raw = span / max(target_ticks, 1)
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for factor in (1, 2, 5, 10):
+        if factor * magnitude >= raw:
+            return factor * magnitude
+    return 10 * magnitude
+
+
+# === CONFIGURABLE DEFAULTS: any key can be overridden by passing a spec dict ===
+EMPIRICAL_RULE_DEFAULTS = {
+    "sources": (),            # CSV / .npy paths and / or NumPy chunks, in any mix
+    "sketch": None,           # a ready TDigest skips reading sources
+    "column": 0,
+    "delimiter": ",",
+    "resolution": 20,         # digest centroids per unit of logit(p)
+    "max_workers": None,
+    "label": "Observed data",
+    "normal_reference": True,  # add a normal row with the same mean and sd for comparison
+}
+
+
+def build_empirical_tick_table(spec=None):
+    # Builds the whole rule as a TickTable; reads the data sources unless spec["sketch"] is given
+    spec = {**EMPIRICAL_RULE_DEFAULTS, **(spec or {})}
+    sketch = spec["sketch"] or sketch_sources(spec["sources"], spec["column"], spec["delimiter"],
+                                              spec["resolution"], spec["max_workers"])
+    if sketch.n == 0:
+        raise ValueError("No numeric values found in the data sources")
+
+    # Configuration
+    width = 1800
+    margin = 80
+    rule_width = width - 2 * margin
+    prob_y = 150
+    rows = [(f"{spec['label']} (n={sketch.n:,})", sketch.cdf)]
+    if spec["normal_reference"] and sketch.std > 0:
+        mean, std = sketch.mean, sketch.std
+        rows.append((f"Normal reference (mean={mean:.4g}, sd={std:.4g})", lambda x: norm.cdf(x, mean, std)))
+    row_y_positions = [250 + 100 * i for i in range(len(rows))]
+    height = row_y_positions[-1] + 160
+
+    # Collect ticks and labels in a columnar tick table
+    table = TickTableBuilder(width, height)
+    table.add_decor("rect", insert=(0, 0), size=(width, height), fill=rgb(248, 248, 240))
+    p_to_position = logit_p_to_position(margin, rule_width)
+
+    # Probability baseline and ticks
+    add_probability_scale(table, p_to_position, prob_y, margin, width, "Probability (P)")
+
+    # === DATA VALUE TICKS: round values between the 0.1% and 99.9% sketch quantiles ===
+    q_lo, q_hi = (float(v) for v in sketch.quantile([P_DISPLAY_MIN, P_DISPLAY_MAX]))
+    if q_hi <= q_lo:
+        q_hi = q_lo + 1.0
+    major_step = _nice_step(q_hi - q_lo, 20)
+    minor_step = major_step / 5
+    first = math.floor(q_lo / minor_step)
+    last = math.ceil(q_hi / minor_step)
+    tick_index = np.arange(first, last + 1)
+    tick_values = tick_index * minor_step
+    is_major = tick_index % 5 == 0
+    decimals = max(0, -int(math.floor(math.log10(major_step))))
+
+    row_colors = [rgb(0, 0, 255), rgb(128, 128, 128)]
+    for (title, cdf), y_pos, color in zip(rows, row_y_positions, row_colors):
+        table.add_decor("line", start=(margin, y_pos), end=(width - margin, y_pos), stroke=color, stroke_width=2)
+        table.add_label(title, title, width/2, y_pos - 30, 12, color)
+        p_values = cdf(tick_values)
+        x_values = p_to_position(p_values)
+        visible = (p_values >= P_DISPLAY_MIN) & (p_values <= P_DISPLAY_MAX)
+        table.add_ticks(title, x_values[visible & ~is_major], y_pos, 6, color, 0.7)
+        last_label_pos = -1e9
+        for idx in np.flatnonzero(visible & is_major):
+            x_pos = float(x_values[idx])
+            tick = table.add_tick(title, x_pos, y_pos, 12, color, 1.8)
+            if abs(x_pos - last_label_pos) > 24:
+                table.add_label(title, f"{tick_values[idx]:.{decimals}f}", x_pos, y_pos + 24, 9, color, tick=tick)
+                last_label_pos = x_pos
+
+    # Title and info
+    table.add_label("title", "Empirical Distribution Slide Rule", width/2, 60, 18, rgb(0, 0, 0),
+                    font_weight="bold")
+    table.add_label("title", f"Quantiles from a t-digest ({len(sketch.means)} centroids) of {sketch.n:,} observations",
+                    width/2, 90, 12, rgb(100, 100, 100))
+
+    # Bounding box
+    table.add_decor("rect", insert=(margin-10, prob_y-40), size=(rule_width+20, row_y_positions[-1] - prob_y + 100),
+                    fill="none", stroke=rgb(200, 200, 200), stroke_width=1.5, rx=6, ry=6)
+    return table.build()
+
+
+def render_empirical_slide_rule(spec=None):
+    # Returns the SVG document as bytes; reads the data sources unless spec["sketch"] is given
+    return table_to_svg(build_empirical_tick_table(spec))
+
+
+def write_empirical_slide_rule(stream, spec=None):
+    stream.write(render_empirical_slide_rule(spec))
+
+
+def generate_empirical_slide_rule(sources, output_file="empirical_slide_rule.svg", spec=None):
+    spec = {**EMPIRICAL_RULE_DEFAULTS, **(spec or {}), "sources": sources}
+    spec["sketch"] = spec["sketch"] or sketch_sources(sources, spec["column"], spec["delimiter"],
+                                                      spec["resolution"], spec["max_workers"])
+    with open(output_file, "wb") as f:
+        write_empirical_slide_rule(f, spec)
+    print(f"Empirical slide rule saved as {output_file}")
+    print(f"Sketched {spec['sketch'].n:,} values into {len(spec['sketch'].means)} centroids")
+
+
+if __name__ == "__main__":
+    # python empirical_slide_rule.py scores.csv [column]
+    generate_empirical_slide_rule([sys.argv[1]], spec={"column": int(sys.argv[2]) if len(sys.argv) > 2 else 0})
@@ -0,0 +1,275 @@
+import numpy as np
+from scipy.stats import nct, ncx2, t as student_t, chi2
+from svgwrite import rgb
+from tick_table import TickTableBuilder, table_to_svg
+from probability_scale import (P_DISPLAY_MIN, P_DISPLAY_MAX, MIN_TICK_SPACING, logit_p_to_position,
+                               add_probability_scale, nice_strides, add_dense_bands)
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import math
+import os
+import tempfile
+
+# Persistent table cache: one .npy file per (distribution, df, nc, grid) row
+TABLE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "statrule", "tables")
+
+# Below this many CDF evaluations a process pool costs more than it saves
+PARALLEL_MIN_CELLS = 200_000
+
+NONCENTRAL_DISTRIBUTIONS = {"nct": nct, "ncx2": ncx2}
+
+# Row tick steps in tenths of the statistic (0.1, 0.5, 1, 5, 10, ...), picked per position from the
+# local pixel spacing so rows never draw more ticks than the rule can resolve
+ROW_STEPS = np.array([1, 5, 10, 50, 100, 500, 1000, 5000, 10000])
+MIN_LABEL_SPACING = 22.0
+
+
+def _noncentral_sf_row(dist_name, x, df, nc):
+    # One vectorized sf call over a row's grid, or a chunk of it (runs in worker processes)
+    return NONCENTRAL_DISTRIBUTIONS[dist_name].sf(x, df, nc)
+
+
+def noncentral_row_grid(dist_name, df, nc):
+    # x grid in tenths for one row, from that row's own df / nc snapped to whole units, so a row keeps
+    # its grid (and its cache entry) whatever other rows are on the sheet
+    if dist_name == "nct":
+        x_min, x_max = -5, math.ceil(nc) + 8
+    else:
+        x_min, x_max = 0, math.ceil(df + nc + 8 * math.sqrt(2 * (df + 2 * nc)))
+    # Integer tenths so labels and cache keys never drift with float steps
+    return np.arange(x_min * 10, x_max * 10 + 1) / 10.0
+
+
+def _row_cache_key(dist_name, x, df, nc):
+    digest = hashlib.sha1()
+    digest.update(dist_name.encode("ascii"))
+    digest.update(np.float64(df).tobytes())
+    digest.update(np.float64(nc).tobytes())
+    digest.update(np.ascontiguousarray(x, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def noncentral_sf_table(dist_name, dfs, ncs, cache_dir=TABLE_CACHE_DIR, max_workers=None):
+    # Right-tail probabilities sf(x | df, nc) for every (df, nc) row, each over its own
+    # noncentral_row_grid. Returns [(x, sf)] in row order. Rows already in the cache are loaded.
+    # Each missing row is one vectorized sf call over its grid; when the missing grids are large,
+    # every grid is cut into chunks that run across worker processes. New rows are written back.
+    dfs = np.asarray(dfs, dtype=np.float64)
+    ncs = np.asarray(ncs, dtype=np.float64)
+    grids = [noncentral_row_grid(dist_name, df, nc) for df, nc in zip(dfs, ncs)]
+    table = [None] * len(grids)
+
+    missing = []
+    keys = []
+    for row, (x, df, nc) in enumerate(zip(grids, dfs, ncs)):
+        key = _row_cache_key(dist_name, x, df, nc)
+        keys.append(key)
+        path = os.path.join(cache_dir, key + ".npy") if cache_dir else None
+        if path and os.path.exists(path):
+            try:
+                table[row] = (x, np.load(path))
+                continue
+            except (OSError, ValueError):
+                pass  # corrupt or truncated entry: recompute it
+        missing.append(row)
+
+    if not missing:
+        return table
+
+    n_cells = sum(len(grids[row]) for row in missing)
+    if n_cells < PARALLEL_MIN_CELLS or max_workers == 1:
+        values = [_noncentral_sf_row(dist_name, grids[row], dfs[row], ncs[row]) for row in missing]
+    else:
+        # Split every grid into column chunks so a single long row also parallelizes
+        workers = max_workers or os.cpu_count() or 1
+        jobs = []
+        for row in missing:
+            for chunk in np.array_split(grids[row], max(1, min(workers * 4, len(grids[row])))):
+                jobs.append((row, chunk))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_noncentral_sf_row, [dist_name] * len(jobs), [chunk for _, chunk in jobs],
+                                  [dfs[row] for row, _ in jobs], [ncs[row] for row, _ in jobs]))
+        values = [np.concatenate([part for (job_row, _), part in zip(jobs, parts) if job_row == row])
+                  for row in missing]
+
+    for row, row_values in zip(missing, values):
+        table[row] = (grids[row], row_values)
+
+    if cache_dir:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+        except OSError:
+            return table  # unwritable cache location: results are returned, just not cached
+        for i, row in enumerate(missing):
+            _write_cache_row(cache_dir, os.path.join(cache_dir, keys[row] + ".npy"), values[i])
+
+    return table
+
+
+def _write_cache_row(cache_dir, path, values):
+    # Unique temp file per call, then an atomic rename: safe with concurrent renders. The cache only
+    # ever degrades to "not cached": any OSError (read-only or full disk, directory removed under us)
+    # drops this row's entry and leaves no temp file behind.
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(dir=cache_dir, suffix=".tmp.npy", delete=False) as f:
+            tmp_path = f.name
+            np.save(f, values)
+        os.replace(tmp_path, path)
+    except OSError:
+        if tmp_path:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+# === CONFIGURABLE DEFAULTS: any key can be overridden by passing a spec dict ===
+POWER_RULE_DEFAULTS = {
+    # "t":    one-sample t-test, effect size d, nc = d * sqrt(df + 1)
+    # "chi2": chi-square test, effect size w, nc = w^2 * sample_size
+    "distribution": "t",
+    "effect_sizes": (0.2, 0.5, 0.8),
+    "dfs": (10, 30),
+    "alpha": 0.05,
+    "sample_size": 100,
+    "cache_dir": TABLE_CACHE_DIR,
+    "max_workers": None,
+}
+
+
+def build_power_analysis_tick_table(spec=None):
+    # Builds the whole rule as a TickTable from spec only: no globals, no printing
+    spec = {**POWER_RULE_DEFAULTS, **(spec or {})}
+    distribution, effect_sizes, dfs = spec["distribution"], spec["effect_sizes"], spec["dfs"]
+    alpha, sample_size = spec["alpha"], spec["sample_size"]
+    if not effect_sizes or not dfs:
+        raise ValueError("spec['effect_sizes'] and spec['dfs'] need at least one value each")
+    if distribution == "t":
+        dist_name = "nct"
+        rows = [(d, df, d * math.sqrt(df + 1)) for d in effect_sizes for df in dfs]
+    elif distribution == "chi2":
+        dist_name = "ncx2"
+        rows = [(w, df, w * w * sample_size) for w in effect_sizes for df in dfs]
+    else:
+        raise ValueError(f"Unknown distribution {distribution!r}, expected 't' or 'chi2'")
+
+    # Configuration
+    width = 1800
+    margin = 80
+    rule_width = width - 2 * margin
+    prob_y = 150
+    first_row_y = 250
+    row_gap = 90
+    row_y_positions = [first_row_y + i * row_gap for i in range(len(rows))]
+    height = row_y_positions[-1] + 200
+
+    # Collect ticks and labels in a columnar tick table
+    table = TickTableBuilder(width, height)
+    table.add_decor("rect", insert=(0, 0), size=(width, height), fill=rgb(248, 248, 240))
+
+    # Vectorized logit position mapping (whole rows at once)
+    p_to_position = logit_p_to_position(margin, rule_width)
+
+    row_colors = [rgb(255, 0, 0), rgb(0, 128, 0), rgb(0, 0, 255), rgb(128, 0, 128),
+                  rgb(200, 100, 0), rgb(0, 128, 128)]
+
+    # === NONCENTRAL TABLE: each row on its own grid, so rows are cached independently ===
+    ncs = np.array([nc for _, _, nc in rows])
+    row_dfs = np.array([df for _, df, _ in rows], dtype=float)
+    if distribution == "t":
+        crit_values = student_t.ppf(1 - alpha, row_dfs)
+    else:
+        crit_values = chi2.ppf(1 - alpha, row_dfs)
+    power_table = noncentral_sf_table(dist_name, row_dfs, ncs,
+                                      cache_dir=spec["cache_dir"], max_workers=spec["max_workers"])
+    # Elementwise: one critical value per row
+    crit_power = NONCENTRAL_DISTRIBUTIONS[dist_name].sf(crit_values, row_dfs, ncs)
+
+    # Probability baseline and ticks (same layout as the t / chi-square rules)
+    add_probability_scale(table, p_to_position, prob_y, margin, width,
+                          "Power (P) - Right Tail of Noncentral Distribution")
+
+    # === NONCENTRAL ROWS ===
+    scale_name = "t" if distribution == "t" else "Chi-square"
+    effect_name = "d" if distribution == "t" else "w"
+    for row, ((effect, df, nc), y_pos) in enumerate(zip(rows, row_y_positions)):
+        color = row_colors[row % len(row_colors)]
+        scale = f"{effect_name}={effect:g} df={df:g}"
+        table.add_decor("line", start=(margin, y_pos), end=(width - margin, y_pos), stroke=color, stroke_width=2)
+        table.add_label(scale, f"Noncentral {scale_name} ({effect_name}={effect:g}, df={df:g}, nc={nc:.2f})",
+                        width/2, y_pos - 30, 12, color)
+
+        x_grid, p_row = power_table[row]
+        visible = (p_row >= P_DISPLAY_MIN) & (p_row <= P_DISPLAY_MAX)
+        x_grid, p_row = x_grid[visible], p_row[visible]
+        grid_tenths = np.rint(x_grid * 10).astype(int)
+        is_major = grid_tenths % 10 == 0
+        is_half = grid_tenths % 5 == 0
+        x_row = p_to_position(p_row)
+
+        # Local pixel distance between 0.1 steps picks the tick step there; thinned runs get a band
+        stride = nice_strides(x_row, MIN_TICK_SPACING, ROW_STEPS)
+        keep = grid_tenths % stride == 0
+        # Labels sit on half / integer ticks at the finest, and never finer than the tick step
+        label_stride = np.maximum(nice_strides(x_row, MIN_LABEL_SPACING, ROW_STEPS), np.maximum(stride, 5))
+        is_labeled = grid_tenths % label_stride == 0
+        add_dense_bands(table, x_row, stride > 1, y_pos, color)
+
+        # Unlabeled 0.1 ticks in one batch, then the integer / half ticks that may carry a label
+        table.add_ticks(scale, x_row[keep & ~is_half], y_pos, 5, color, 0.6)
+        last_label_pos = -1e9
+        for idx in np.flatnonzero(keep & is_half):
+            x_pos = float(x_row[idx])
+            tick_size, stroke_width = (15, 2.0) if is_major[idx] else (10, 1.2)
+            tick = table.add_tick(scale, x_pos, y_pos, tick_size, color, stroke_width)
+            if is_labeled[idx] and abs(x_pos - last_label_pos) > MIN_LABEL_SPACING:
+                label = f"{x_grid[idx]:.0f}" if is_major[idx] else f"{x_grid[idx]:.1f}"
+                table.add_label(scale, label, x_pos, y_pos + tick_size + 12, 9 if is_major[idx] else 8,
+                                color, tick=tick)
+                last_label_pos = x_pos
+
+        # Marker: power at the central critical value for this alpha
+        if P_DISPLAY_MIN <= crit_power[row] <= P_DISPLAY_MAX:
+            x_crit = float(p_to_position(crit_power[row]))
+            table.add_decor("polygon", points=[(x_crit, y_pos - 2), (x_crit - 5, y_pos - 10), (x_crit + 5, y_pos - 10)],
+                            fill=rgb(0, 0, 0))
+            table.add_label(scale, f"power={crit_power[row]:.3f}", x_crit + 8, y_pos - 6, 8, rgb(0, 0, 0),
+                            text_anchor="start")
+
+    # Title and info
+    table.add_label("title", f"Power Analysis Slide Rule (Noncentral {scale_name})", width/2, 60, 18,
+                    rgb(0, 0, 0), font_weight="bold")
+    table.add_label("title", f"Right-tail power for each effect size and df, marker at the critical value for alpha={alpha:g}",
+                    width/2, 90, 12, rgb(100, 100, 100))
+
+    explanation_y = row_y_positions[-1] + 80
+    table.add_label("title", f"How to use: Find the critical {scale_name} value on a row and read the power on the top scale",
+                    width/2, explanation_y, 10, rgb(80, 80, 80))
+
+    # Bounding box
+    table.add_decor("rect", insert=(margin-10, prob_y-40), size=(rule_width+20, row_y_positions[-1] - prob_y + 100),
+                    fill="none", stroke=rgb(200, 200, 200), stroke_width=1.5, rx=6, ry=6)
+
+    return table.build()
+
+
+def render_power_analysis_slide_rule(spec=None):
+    # Pure and reentrant: returns the SVG document as bytes (the table cache is written atomically)
+    return table_to_svg(build_power_analysis_tick_table(spec))
+
+
+def write_power_analysis_slide_rule(stream, spec=None):
+    stream.write(render_power_analysis_slide_rule(spec))
+
+
+def generate_power_analysis_slide_rule(output_file="power_analysis_slide_rule.svg", spec=None):
+    spec = {**POWER_RULE_DEFAULTS, **(spec or {})}
+    with open(output_file, "wb") as f:
+        write_power_analysis_slide_rule(f, spec)
+    print(f"Power analysis slide rule saved as {output_file}")
+    print(f"Rows: effect sizes {list(spec['effect_sizes'])} x df {list(spec['dfs'])} ({spec['distribution']})")
+
+
+if __name__ == "__main__":
+    generate_power_analysis_slide_rule()
@@ -0,0 +1,66 @@
+import numpy as np
+from svgwrite import rgb
+import math
+
+# Same probability display range and logit expansion as the t / chi-square rules
+P_DISPLAY_MIN, P_DISPLAY_MAX = 0.001, 0.999
+# Positions are clamped a little past the display range, then clipped to the rule ends
+P_LOGIT_MIN, P_LOGIT_MAX = 0.0005, 0.9995
+
+MAIN_PROBS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9,
+              0.95, 0.975, 0.99, 0.995, 0.999)
+
+
+def logit_p_to_position(margin, rule_width, p_min=P_DISPLAY_MIN, p_max=P_DISPLAY_MAX):
+    # Vectorized logit position mapping: takes a scalar or whole rows of probabilities.
+    # p_min / p_max land on the rule ends
+    logit_display_min = math.log(p_min / (1 - p_min))
+    logit_display_max = math.log(p_max / (1 - p_max))
+
+    def p_to_position(p):
+        p_clamped = np.clip(p, P_LOGIT_MIN, P_LOGIT_MAX)
+        logit_p = np.log(p_clamped / (1 - p_clamped))
+        normalized = (logit_p - logit_display_min) / (logit_display_max - logit_display_min)
+        return margin + rule_width * np.clip(normalized, 0.0, 1.0)
+
+    return p_to_position
+
+
+def add_probability_scale(table, p_to_position, y_pos, margin, width, title, scale="P"):
+    # Baseline, title and the MAIN_PROBS ticks / labels of the top probability scale
+    table.add_decor("line", start=(margin, y_pos), end=(width - margin, y_pos),
+                    stroke=rgb(0, 0, 0), stroke_width=2)
+    table.add_label(scale, title, width/2, y_pos - 30, 12, rgb(0, 0, 0))
+    for p in MAIN_PROBS:
+        x_pos = float(p_to_position(p))
+        if p < 0.1 or p > 0.9:
+            tick_size, stroke_width, font_size, label = 15, 2.0, 10, f"{p:.3f}"
+        elif p in (0.1, 0.9):
+            tick_size, stroke_width, font_size, label = 12, 1.5, 9, f"{p:.2f}"
+        else:
+            tick_size, stroke_width, font_size, label = 8, 1.0, 8, f"{p:.2f}"
+        tick = table.add_tick(scale, x_pos, y_pos, -tick_size, rgb(0, 0, 0), stroke_width)
+        table.add_label(scale, label, x_pos, y_pos - tick_size - 10, font_size, rgb(0, 0, 0), tick=tick)
+
+
+# === PIXEL THINNING: rows whose steps land closer than the pixel resolution ===
+# Ticks closer than this (px) are thinned to a coarser step, the skipped run is drawn as a band
+MIN_TICK_SPACING = 2.0
+
+
+def nice_strides(x, min_spacing, steps):
+    # For each position of a row of step-wise positions x, the smallest step in steps (integer
+    # multiples of the row's grid step) that keeps neighbouring ticks at least min_spacing px apart
+    spacing = np.abs(np.gradient(x)) if len(x) > 1 else np.array([np.inf])
+    required = np.ceil(min_spacing / np.maximum(spacing, 1e-9))
+    idx = np.searchsorted(steps, required, side="left")
+    return steps[np.minimum(idx, len(steps) - 1)]
+
+
+def add_dense_bands(table, x, dense, y_pos, color):
+    # One translucent band per run of positions where the row is too dense to draw every step
+    edges = np.diff(np.concatenate(([0], dense.astype(np.int8), [0])))
+    for start, end in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1):
+        x_start, x_end = sorted((float(x[start]), float(x[end])))
+        table.add_decor("rect", insert=(x_start, y_pos), size=(max(x_end - x_start, 0.5), 4),
+                        fill=color, fill_opacity=0.25, stroke="none")
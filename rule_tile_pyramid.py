@@ -0,0 +1,372 @@
+import bisect
+import hashlib
+import http.server
+import json
+import math
+import os
+import re
+import sys
+import threading
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+
+SVG_NS = "http://www.w3.org/2000/svg"
+TILE_SIZE = 256
+
+# Detail classes: 0 = baselines, major ticks and labels, 1 = minor ticks, 2 = fine / 0.01 tail marks
+MINOR_STROKE = 0.5
+MAJOR_STROKE = 1.5
+MIN_COARSE_FONT = 10
+# Which detail classes each zoom level shows (levels past the end show everything)
+DETAIL_BY_LEVEL = (0, 0, 1, 1, 2)
+# A label takes the detail class of the tick it belongs to: the generators place labels at their tick's
+# x, at most LABEL_TICK_GAP px from its end. Labels without a tick (titles, notes) are classed by font size.
+LABEL_TICK_DX = 0.05
+LABEL_TICK_GAP = 45.0
+# Elements wider than this share of the rule (background, baselines, boxes, titles) stay out of the
+# left-edge index and are checked by every tile
+WIDE_SHARE = 0.1
+
+TILE_PATH = re.compile(r"/(\d+)/(\d+)/(\d+)\.svg")
+
+ET.register_namespace("", SVG_NS)
+
+
+def _strip_ns(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _line_detail(stroke_width, dashed=False):
+    if stroke_width >= MAJOR_STROKE or dashed:
+        return 0
+    return 1 if stroke_width >= MINOR_STROKE else 2
+
+
+def _text_detail_and_bbox(x, y, font_size, text, rotated):
+    half_width = len(text) * font_size * 0.3
+    if rotated:
+        # Rotated labels: a square around the insertion point covers every rotation
+        reach = max(half_width * 2, font_size)
+        bbox = (x - reach, y - reach, x + reach, y + reach)
+    else:
+        bbox = (x - half_width * 2, y - font_size, x + half_width * 2, y + font_size / 3)
+    return (0 if font_size >= MIN_COARSE_FONT else 1), bbox
+
+
+def _element_detail_and_bbox(element):
+    # Returns (detail, (xmin, ymin, xmax, ymax)) or None for elements that are not drawn
+    tag = _strip_ns(element.tag)
+    get = lambda name, default=0.0: float(element.get(name, default))
+    if tag == "line":
+        x1, y1, x2, y2 = get("x1"), get("y1"), get("x2"), get("y2")
+        stroke_width = get("stroke-width", 1)
+        pad = stroke_width / 2
+        return (_line_detail(stroke_width, bool(element.get("stroke-dasharray"))),
+                (min(x1, x2) - pad, min(y1, y2) - pad, max(x1, x2) + pad, max(y1, y2) + pad))
+    if tag == "text":
+        return _text_detail_and_bbox(get("x"), get("y"), get("font-size", 10),
+                                     "".join(element.itertext()), bool(element.get("transform")))
+    if tag == "rect":
+        x, y = get("x"), get("y")
+        return 0, (x, y, x + get("width"), y + get("height"))
+    if tag == "circle":
+        cx, cy, r = get("cx"), get("cy"), get("r")
+        return 0, (cx - r, cy - r, cx + r, cy + r)
+    if tag == "polygon":
+        coords = [float(v) for v in element.get("points", "").replace(",", " ").split()]
+        xs, ys = coords[0::2], coords[1::2]
+        return 0, (min(xs), min(ys), max(xs), max(ys))
+    return None
+
+
+def _nearest_tick(ticks, tick_xs, x, y):
+    # ticks: sorted (x, ymin, ymax, detail) of vertical tick lines; returns (gap, tick index) or None
+    start = bisect.bisect_left(tick_xs, x - LABEL_TICK_DX)
+    best = None
+    for i, (_, ymin, ymax, _) in enumerate(ticks[start:bisect.bisect_right(tick_xs, x + LABEL_TICK_DX)], start):
+        gap = max(ymin - y, y - ymax, 0.0)
+        if gap <= LABEL_TICK_GAP and (best is None or gap < best[0]):
+            best = (gap, i)
+    return best
+
+
+def _svg_elements(root):
+    # (left edge, bbox, detail, markup) for every drawn element of a parsed SVG, in paint order
+    elements = []
+    ticks = []
+    texts = []
+    for element in root.iter():
+        info = _element_detail_and_bbox(element)
+        if info is None:
+            continue
+        detail, bbox = info
+        tag = _strip_ns(element.tag)
+        if tag == "line" and element.get("x1") == element.get("x2") and not element.get("stroke-dasharray"):
+            ticks.append((float(element.get("x1")), bbox[1], bbox[3], detail))
+        elif tag == "text":
+            texts.append((len(elements), float(element.get("x", 0)), float(element.get("y", 0))))
+        element.tail = None
+        elements.append((bbox[0], bbox, detail, ET.tostring(element, encoding="unicode")))
+
+    # Labels follow the tick they sit on, so coarse zooms never show unlabeled major ticks. Each tick
+    # belongs to its closest text only, so a title centred over a tick keeps its own class.
+    ticks.sort()
+    tick_xs = [tick[0] for tick in ticks]
+    claims = {}
+    for index, x, y in texts:
+        match = _nearest_tick(ticks, tick_xs, x, y)
+        if match is not None and (match[1] not in claims or match[0] < claims[match[1]][0]):
+            claims[match[1]] = (match[0], index)
+    for tick, (_, index) in claims.items():
+        left, bbox, _, markup = elements[index]
+        elements[index] = (left, bbox, ticks[tick][3], markup)
+    return elements
+
+
+def _table_elements(table):
+    # Same index straight from a tick_table.TickTable: ticks and labels never go through an SVG parse
+    from tick_table import _decor_drawing
+    elements = _svg_elements(ET.fromstring(_decor_drawing(table).tostring()))
+    labels_elements = []
+    for scale in table.scales.values():
+        ticks = scale["ticks"]
+        labels = scale["labels"]
+        # Labels take the detail class of their tick (ticks["label"] points at the label row)
+        label_details = [None] * len(labels)
+        for x, y, length, stroke_class, label in zip(ticks["x"].tolist(), ticks["y"].tolist(),
+                                                     ticks["length"].tolist(), ticks["stroke_class"].tolist(),
+                                                     ticks["label"].tolist()):
+            stroke, stroke_width = table.stroke_classes[stroke_class]
+            y2 = y + length
+            pad = stroke_width / 2
+            detail = _line_detail(stroke_width)
+            if label >= 0:
+                label_details[label] = detail
+            elements.append((x - pad, (x - pad, min(y, y2) - pad, x + pad, max(y, y2) + pad), detail,
+                             f'<line x1="{x:.2f}" y1="{y:.2f}" x2="{x:.2f}" y2="{y2:.2f}" '
+                             f'stroke="{stroke}" stroke-width="{stroke_width:g}" />'))
+        for x, y, rotation, style, text, tick_detail in zip(labels["x"].tolist(), labels["y"].tolist(),
+                                                            labels["rotation"].tolist(), labels["style"].tolist(),
+                                                            labels["text"].tolist(), label_details):
+            fill, font_size, anchor, weight = table.label_styles[style]
+            text = table.pool[text]
+            detail, bbox = _text_detail_and_bbox(x, y, font_size, text, bool(rotation))
+            rotate = f' transform="rotate({rotation},{x:.2f},{y:.2f})"' if rotation else ""
+            labels_elements.append((bbox[0], bbox, detail if tick_detail is None else tick_detail,
+                                    f'<text x="{x:.2f}" y="{y:.2f}" fill="{fill}" font-family="Arial" '
+                                    f'font-size="{font_size:g}" font-weight="{weight}" text-anchor="{anchor}"'
+                                    f'{rotate}>{escape(text)}</text>'))
+    # Same paint order as table_to_svg: decor, every tick, then every label
+    return elements + labels_elements
+
+
+def _table_id(table):
+    from tick_table import TICK_DTYPE, LABEL_DTYPE
+    digest = hashlib.sha1(json.dumps([table.width, table.height, table.stroke_classes, table.label_styles,
+                                      table.pool, table.decor]).encode("utf-8"))
+    # Field by field, so a record array and a reloaded set of Arrow columns hash the same
+    for scale in table.scales.values():
+        for rows, dtype in ((scale["ticks"], TICK_DTYPE), (scale["labels"], LABEL_DTYPE)):
+            for field in dtype.names:
+                digest.update(rows[field].tobytes())
+    return digest.hexdigest()[:16]
+
+
+class RuleTilePyramid:
+    # Level-of-detail tile pyramid for one rule SVG. Tiles are built on first request and cached
+    # in memory and, when cache_dir is given, on disk as cache_dir/<rule hash>/<z>/<x>/<y>.svg.
+
+    def __init__(self, svg_bytes, max_level=5, cache_dir=None):
+        root = ET.fromstring(svg_bytes)
+        self._index(float(root.get("width", "0").rstrip("px")), float(root.get("height", "0").rstrip("px")),
+                    hashlib.sha1(svg_bytes).hexdigest()[:16], _svg_elements(root), max_level, cache_dir)
+
+    @classmethod
+    def from_table(cls, table, max_level=5, cache_dir=None):
+        # Builds the pyramid from a TickTable instead of parsing a rendered SVG
+        pyramid = cls.__new__(cls)
+        pyramid._index(float(table.width), float(table.height), _table_id(table), _table_elements(table),
+                       max_level, cache_dir)
+        return pyramid
+
+    def _index(self, width, height, rule_id, elements, max_level, cache_dir):
+        self.width = width
+        self.height = height
+        self.max_level = max_level
+        self.rule_id = rule_id
+        self.cache_dir = os.path.join(cache_dir, self.rule_id) if cache_dir else None
+        self._tiles = {}
+        self._lock = threading.Lock()
+
+        # (left, bbox, detail, paint order, markup). Wide elements are checked by every tile, the
+        # rest go in a flat index sorted by left edge so a tile only scans elements that can reach it
+        wide_limit = width * WIDE_SHARE
+        indexed = [(left, bbox, detail, order, markup) for order, (left, bbox, detail, markup) in enumerate(elements)]
+        self._wide = [e for e in indexed if e[1][2] - e[1][0] > wide_limit]
+        narrow = sorted((e for e in indexed if e[1][2] - e[1][0] <= wide_limit), key=lambda e: e[0])
+        self._left_edges = [e[0] for e in narrow]
+        self._elements = narrow
+        # Widest indexed element bounds how far left of a tile we have to start scanning
+        self._max_span = max((e[1][2] - e[1][0] for e in narrow), default=0.0)
+
+    def scale(self, level):
+        # Level 0 fits the whole rule width into one tile, each level doubles it
+        return TILE_SIZE * (2 ** level) / self.width
+
+    def grid_size(self, level):
+        scale = self.scale(level)
+        return 2 ** level, max(1, math.ceil(self.height * scale / TILE_SIZE))
+
+    def tile(self, level, col, row):
+        if not 0 <= level <= self.max_level:
+            raise ValueError(f"Level {level} outside 0..{self.max_level}")
+        cols, rows = self.grid_size(level)
+        if not (0 <= col < cols and 0 <= row < rows):
+            raise ValueError(f"Tile {col},{row} outside the {cols}x{rows} grid of level {level}")
+
+        key = (level, col, row)
+        cached = self._tiles.get(key)
+        if cached is not None:
+            return cached
+
+        path = os.path.join(self.cache_dir, str(level), str(col), f"{row}.svg") if self.cache_dir else None
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+        else:
+            data = self._render_tile(level, col, row)
+            if path:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+
+        with self._lock:
+            self._tiles[key] = data
+        return data
+
+    def _render_tile(self, level, col, row):
+        size = TILE_SIZE / self.scale(level)
+        x0, y0 = col * size, row * size
+        x1, y1 = x0 + size, y0 + size
+        max_detail = DETAIL_BY_LEVEL[min(level, len(DETAIL_BY_LEVEL) - 1)]
+
+        start = bisect.bisect_left(self._left_edges, x0 - self._max_span)
+        stop = bisect.bisect_right(self._left_edges, x1)
+        hits = []
+        for _, bbox, detail, order, markup in self._wide + self._elements[start:stop]:
+            if detail > max_detail:
+                continue
+            if bbox[2] < x0 or bbox[0] > x1 or bbox[3] < y0 or bbox[1] > y1:
+                continue
+            hits.append((order, markup))
+        hits.sort()
+        parts = [f'<svg xmlns="{SVG_NS}" width="{TILE_SIZE}" height="{TILE_SIZE}" '
+                 f'viewBox="{x0:.3f} {y0:.3f} {size:.3f} {size:.3f}">']
+        parts.extend(markup.replace(f' xmlns="{SVG_NS}"', "") for _, markup in hits)
+        parts.append("</svg>")
+        return "".join(parts).encode("utf-8")
+
+    def metadata(self):
+        return {
+            "rule_id": self.rule_id,
+            "width": self.width,
+            "height": self.height,
+            "tile_size": TILE_SIZE,
+            "max_level": self.max_level,
+            "grid": [list(self.grid_size(level)) for level in range(self.max_level + 1)],
+        }
+
+
+VIEWER_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Slide rule tiles</title>
+<link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css">
+<script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+<style>html, body, #map {{ height: 100%; margin: 0; background: rgb(248,248,240); }}</style>
+</head><body><div id="map"></div><script>
+var map = L.map('map', {{crs: L.CRS.Simple, minZoom: 0, maxZoom: {max_level}}});
+L.tileLayer('{{z}}/{{x}}/{{y}}.svg', {{tileSize: {tile_size}, noWrap: true, maxNativeZoom: {max_level},
+    bounds: [[-{bound_y}, 0], [0, {tile_size}]]}}).addTo(map);
+map.fitBounds([[-{bound_y}, 0], [0, {tile_size}]]);
+</script></body></html>
+"""
+
+
+def export_tile_pyramid(svg_file, output_dir=None, max_level=5, prerender=False):
+    # Writes pyramid.json and a Leaflet viewer. prerender=True also writes every tile for static
+    # hosting; otherwise serve_tile_pyramid renders each tile on its first request.
+    # svg_file is either a path to a rule SVG or a TickTable.
+    if hasattr(svg_file, "scales"):
+        output_dir = output_dir or "slide_rule_tiles"
+        pyramid = RuleTilePyramid.from_table(svg_file, max_level=max_level)
+        svg_file = "tick table"
+    else:
+        with open(svg_file, "rb") as f:
+            svg_bytes = f.read()
+        output_dir = output_dir or svg_file.rsplit(".", 1)[0] + "_tiles"
+        pyramid = RuleTilePyramid(svg_bytes, max_level=max_level)
+    os.makedirs(output_dir, exist_ok=True)
+
+    with open(os.path.join(output_dir, "pyramid.json"), "w") as f:
+        json.dump(pyramid.metadata(), f, indent=2)
+    with open(os.path.join(output_dir, "index.html"), "w") as f:
+        f.write(VIEWER_HTML.format(max_level=max_level, tile_size=TILE_SIZE,
+                                   bound_y=pyramid.height * pyramid.scale(0)))
+
+    n_tiles = 0
+    if prerender:
+        pyramid.cache_dir = output_dir
+        for level in range(max_level + 1):
+            cols, rows = pyramid.grid_size(level)
+            for col in range(cols):
+                for row in range(rows):
+                    pyramid.tile(level, col, row)
+                    n_tiles += 1
+
+    print(f"Tile pyramid for {svg_file} saved in {output_dir}")
+    print(f"Levels 0-{max_level}, {n_tiles} tiles prerendered")
+    return pyramid
+
+
+def serve_tile_pyramid(pyramid, output_dir, port=8000):
+    # Serves index.html / pyramid.json from output_dir; tiles come from pyramid.tile, so each one is
+    # rendered on its first request and then answered from the pyramid cache
+    class TileHandler(http.server.SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=output_dir, **kwargs)
+
+        def do_GET(self):
+            match = TILE_PATH.fullmatch(self.path.split("?", 1)[0])
+            if match is None:
+                return super().do_GET()
+            try:
+                data = pyramid.tile(*(int(v) for v in match.groups()))
+            except ValueError:
+                return self.send_error(404, "Tile outside the pyramid")
+            self.send_response(200)
+            self.send_header("Content-Type", "image/svg+xml")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), TileHandler)
+    print(f"Serving {output_dir} on http://127.0.0.1:{port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    # python rule_tile_pyramid.py rule.svg              serves tiles on demand
+    # python rule_tile_pyramid.py rule.svg --prerender  writes every tile for static hosting
+    args = [arg for arg in sys.argv[1:] if arg != "--prerender"]
+    svg_file = args[0] if args else "chi2_distribution_slide_rule_enhanced005.svg"
+    output_dir = svg_file.rsplit(".", 1)[0] + "_tiles"
+    if "--prerender" in sys.argv:
+        export_tile_pyramid(svg_file, output_dir, prerender=True)
+    else:
+        serve_tile_pyramid(export_tile_pyramid(svg_file, output_dir), output_dir)
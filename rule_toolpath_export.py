@@ -0,0 +1,277 @@
+import math
+import sys
+import xml.etree.ElementTree as ET
+
+# === LASER / PLOTTER LAYERS: one per tick class, thickest stroke first match wins ===
+# power is the spindle/laser S value (0-1000), feed in mm/min, color is the DXF color index
+TOOLPATH_LAYERS = [
+    {"name": "BASELINE", "min_stroke": 1.95, "min_length": 100, "power": 800, "feed": 1200, "color": 7},
+    {"name": "MAJOR", "min_stroke": 1.5, "min_length": 0, "power": 700, "feed": 1500, "color": 1},
+    {"name": "MINOR", "min_stroke": 0.7, "min_length": 0, "power": 500, "feed": 2000, "color": 3},
+    {"name": "FINE", "min_stroke": 0.0, "min_length": 0, "power": 300, "feed": 2500, "color": 5},
+]
+
+PX_TO_MM = 25.4 / 96      # SVG user units are CSS pixels
+RAPID_FEED = 6000         # mm/min for G0 travel in the time estimate
+ROW_GAP = 20              # px: vertical gap that starts a new scale row
+MERGE_TOLERANCE = 0.05    # px: collinearity / overlap tolerance when merging cuts
+
+
+def _strip_ns(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def read_svg_segments(svg_file):
+    # Collect every <line> of a generated rule as (x1, y1, x2, y2, stroke_width), in emitted order.
+    # Dashed guide lines are decorative and are not cut.
+    root = ET.parse(svg_file).getroot()
+    height = float(root.get("height", "0").rstrip("px") or 0)
+    segments = []
+    for element in root.iter():
+        if _strip_ns(element.tag) != "line" or element.get("stroke-dasharray"):
+            continue
+        segments.append((float(element.get("x1", 0)), float(element.get("y1", 0)),
+                         float(element.get("x2", 0)), float(element.get("y2", 0)),
+                         float(element.get("stroke-width", 1))))
+    return segments, height
+
+
+def classify_segment(segment, layers=TOOLPATH_LAYERS):
+    x1, y1, x2, y2, stroke_width = segment
+    length = math.hypot(x2 - x1, y2 - y1)
+    for layer in layers:
+        if stroke_width >= layer["min_stroke"] and length >= layer["min_length"]:
+            return layer["name"]
+    return layers[-1]["name"]
+
+
+def merge_collinear_segments(segments):
+    # Merge overlapping or touching axis-aligned cuts on the same line (e.g. the chi-square
+    # probability baseline that is drawn twice, or grid lines running over ticks).
+    vertical, horizontal, other = {}, {}, []
+    for x1, y1, x2, y2 in segments:
+        if abs(x1 - x2) <= MERGE_TOLERANCE:
+            vertical.setdefault(round(x1 / MERGE_TOLERANCE), []).append((min(y1, y2), max(y1, y2), x1))
+        elif abs(y1 - y2) <= MERGE_TOLERANCE:
+            horizontal.setdefault(round(y1 / MERGE_TOLERANCE), []).append((min(x1, x2), max(x1, x2), y1))
+        else:
+            other.append((x1, y1, x2, y2))
+
+    merged = []
+    for groups, is_vertical in ((vertical, True), (horizontal, False)):
+        for spans in groups.values():
+            spans.sort()
+            lo, hi, fixed = spans[0]
+            for start, end, _ in spans[1:]:
+                if start <= hi + MERGE_TOLERANCE:
+                    hi = max(hi, end)
+                else:
+                    merged.append((fixed, lo, fixed, hi) if is_vertical else (lo, fixed, hi, fixed))
+                    lo, hi = start, end
+            merged.append((fixed, lo, fixed, hi) if is_vertical else (lo, fixed, hi, fixed))
+    return merged + other
+
+
+def _group_rows(segments):
+    # Scale rows are separated by vertical gaps between segment midpoints
+    ordered = sorted(segments, key=lambda s: (s[1] + s[3]) / 2)
+    rows = []
+    last_mid = None
+    for seg in ordered:
+        mid = (seg[1] + seg[3]) / 2
+        if last_mid is None or mid - last_mid > ROW_GAP:
+            rows.append([])
+        rows[-1].append(seg)
+        last_mid = mid
+    # Sweep each row left to right
+    return [sorted(row, key=lambda s: min(s[0], s[2])) for row in rows]
+
+
+def _sweep_row(row, reverse, head):
+    # Cut a row in one sweep; each cut starts at whichever end is nearer the head
+    cuts = []
+    for x1, y1, x2, y2 in (reversed(row) if reverse else row):
+        if math.hypot(x2 - head[0], y2 - head[1]) < math.hypot(x1 - head[0], y1 - head[1]):
+            x1, y1, x2, y2 = x2, y2, x1, y1
+        cuts.append((x1, y1, x2, y2))
+        head = (x2, y2)
+    return cuts, head
+
+
+def _row_ends(row, reverse):
+    first, last = (row[-1], row[0]) if reverse else (row[0], row[-1])
+    return (first[0], first[1]), (last[2], last[3])
+
+
+def _tour_travel(rows, tour, start):
+    head = start
+    travel = 0.0
+    for index, reverse in tour:
+        entry, exit_ = _row_ends(rows[index], reverse)
+        travel += math.hypot(entry[0] - head[0], entry[1] - head[1])
+        head = exit_
+    return travel
+
+
+def order_cuts(segments, start=(0.0, 0.0)):
+    # Sweep within each scale row, nearest-neighbour across rows, then 2-opt on the row tour
+    rows = _group_rows(segments)
+    if not rows:
+        return [], start
+
+    # Nearest-neighbour: pick the closest row entry (either sweep direction)
+    remaining = set(range(len(rows)))
+    tour = []
+    head = start
+    while remaining:
+        best = None
+        for index in remaining:
+            for reverse in (False, True):
+                entry, _ = _row_ends(rows[index], reverse)
+                dist = math.hypot(entry[0] - head[0], entry[1] - head[1])
+                if best is None or dist < best[0]:
+                    best = (dist, index, reverse)
+        _, index, reverse = best
+        tour.append((index, reverse))
+        remaining.discard(index)
+        head = _row_ends(rows[index], reverse)[1]
+
+    # 2-opt: reversing a stretch of the tour also flips each row's sweep direction
+    best_travel = _tour_travel(rows, tour, start)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(tour) - 1):
+            for j in range(i + 1, len(tour)):
+                candidate = tour[:i] + [(idx, not rev) for idx, rev in reversed(tour[i:j + 1])] + tour[j + 1:]
+                travel = _tour_travel(rows, candidate, start)
+                if travel < best_travel - 1e-9:
+                    tour, best_travel, improved = candidate, travel, True
+
+    cuts = []
+    head = start
+    for index, reverse in tour:
+        row_cuts, head = _sweep_row(rows[index], reverse, head)
+        cuts.extend(row_cuts)
+    return cuts, head
+
+
+def _path_lengths(cuts, start=(0.0, 0.0)):
+    cut_length = travel = 0.0
+    head = start
+    for x1, y1, x2, y2 in cuts:
+        travel += math.hypot(x1 - head[0], y1 - head[1])
+        cut_length += math.hypot(x2 - x1, y2 - y1)
+        head = (x2, y2)
+    return cut_length, travel
+
+
+def plan_toolpath(segments, layers=TOOLPATH_LAYERS):
+    # Returns [(layer, [cuts])] in machine order; layers run in the order they are configured
+    by_layer = {layer["name"]: [] for layer in layers}
+    for segment in segments:
+        by_layer[classify_segment(segment, layers)].append(segment[:4])
+
+    plan = []
+    head = (0.0, 0.0)
+    for layer in layers:
+        if not by_layer[layer["name"]]:
+            continue
+        cuts, head = order_cuts(merge_collinear_segments(by_layer[layer["name"]]), head)
+        plan.append((layer, cuts))
+    return plan
+
+
+def estimate_machine_time(plan, px_to_mm=PX_TO_MM):
+    # Minutes: cutting at each layer's feed plus rapid travel between cuts
+    minutes = 0.0
+    head = (0.0, 0.0)
+    for layer, cuts in plan:
+        cut_length, travel = _path_lengths(cuts, head)
+        minutes += cut_length * px_to_mm / layer["feed"] + travel * px_to_mm / RAPID_FEED
+        if cuts:
+            head = cuts[-1][2:]
+    return minutes
+
+
+def _to_machine(x, y, sheet_height, px_to_mm):
+    # SVG y grows downwards, machine Y grows upwards
+    return x * px_to_mm, (sheet_height - y) * px_to_mm
+
+
+def write_dxf(plan, dxf_file, sheet_height, px_to_mm=PX_TO_MM):
+    # Minimal AutoCAD R12 ASCII DXF: one LAYER table entry per tick class, LINE entities in cut order
+    out = ["0", "SECTION", "2", "HEADER", "9", "$INSUNITS", "70", "4", "0", "ENDSEC",
+           "0", "SECTION", "2", "TABLES", "0", "TABLE", "2", "LAYER", "70", str(len(plan))]
+    for layer, _ in plan:
+        out += ["0", "LAYER", "2", layer["name"], "70", "0", "62", str(layer["color"]), "6", "CONTINUOUS"]
+    out += ["0", "ENDTAB", "0", "ENDSEC", "0", "SECTION", "2", "ENTITIES"]
+    for layer, cuts in plan:
+        for x1, y1, x2, y2 in cuts:
+            mx1, my1 = _to_machine(x1, y1, sheet_height, px_to_mm)
+            mx2, my2 = _to_machine(x2, y2, sheet_height, px_to_mm)
+            out += ["0", "LINE", "8", layer["name"],
+                    "10", f"{mx1:.4f}", "20", f"{my1:.4f}", "30", "0.0",
+                    "11", f"{mx2:.4f}", "21", f"{my2:.4f}", "31", "0.0"]
+    out += ["0", "ENDSEC", "0", "EOF"]
+    with open(dxf_file, "w") as f:
+        f.write("\n".join(out) + "\n")
+
+
+def write_gcode(plan, gcode_file, sheet_height, px_to_mm=PX_TO_MM):
+    # GRBL-style laser G-code: M4 dynamic power, laser off (S0) on every rapid
+    out = ["G21 ; millimetres", "G90 ; absolute coordinates"]
+    head = None
+    for layer, cuts in plan:
+        out.append(f"; layer {layer['name']} power={layer['power']} feed={layer['feed']}")
+        out.append("M4 S0")
+        for x1, y1, x2, y2 in cuts:
+            mx1, my1 = _to_machine(x1, y1, sheet_height, px_to_mm)
+            mx2, my2 = _to_machine(x2, y2, sheet_height, px_to_mm)
+            if head is None or abs(head[0] - mx1) > 1e-4 or abs(head[1] - my1) > 1e-4:
+                out.append(f"G0 X{mx1:.3f} Y{my1:.3f} S0")
+            out.append(f"G1 X{mx2:.3f} Y{my2:.3f} S{layer['power']} F{layer['feed']}")
+            head = (mx2, my2)
+    out += ["M5", "G0 X0 Y0"]
+    with open(gcode_file, "w") as f:
+        f.write("\n".join(out) + "\n")
+
+
+def table_segments(table):
+    # Same (segments, height) as read_svg_segments, straight from a tick_table.TickTable: no SVG parse
+    segments = list(table.tick_segments()) + list(table.decor_segments())
+    return segments, float(table.height)
+
+
+def export_rule_toolpath(svg_file, dxf_file=None, gcode_file=None, layers=TOOLPATH_LAYERS,
+                         px_to_mm=PX_TO_MM):
+    # svg_file is either a path to a rule SVG or a TickTable from one of the build_*_tick_table functions
+    if hasattr(svg_file, "tick_segments"):
+        segments, sheet_height = table_segments(svg_file)
+        base = "slide_rule"
+    else:
+        segments, sheet_height = read_svg_segments(svg_file)
+        base = svg_file.rsplit(".", 1)[0]
+    dxf_file = dxf_file or base + ".dxf"
+    gcode_file = gcode_file or base + ".gcode"
+
+    plan = plan_toolpath(segments, layers)
+    write_dxf(plan, dxf_file, sheet_height, px_to_mm)
+    write_gcode(plan, gcode_file, sheet_height, px_to_mm)
+
+    # Compare with cutting every <line> in emitted order, one layer after another
+    naive_plan = []
+    for layer in layers:
+        cuts = [s[:4] for s in segments if classify_segment(s, layers) == layer["name"]]
+        if cuts:
+            naive_plan.append((layer, cuts))
+    n_cuts = sum(len(cuts) for _, cuts in plan)
+    print(f"Toolpath for {base} saved as {dxf_file} and {gcode_file}")
+    print(f"Cuts: {len(segments)} lines merged into {n_cuts} cuts on {len(plan)} layers")
+    print(f"Estimated machine time: {estimate_machine_time(plan, px_to_mm):.1f} min "
+          f"(emitted order: {estimate_machine_time(naive_plan, px_to_mm):.1f} min)")
+    return plan
+
+
+if __name__ == "__main__":
+    export_rule_toolpath(sys.argv[1] if len(sys.argv) > 1 else "t_distribution_slide_rule_enhanced.svg")
@@ -0,0 +1,71 @@
+import asyncio
+import importlib.util
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# The original generator scripts have spaces in their file names, so they are loaded by path
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _load_script(module_name, file_name):
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(_HERE, file_name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_z_rule = _load_script("z_disrule", "z disrule.py")
+_t_rule = _load_script("t_student_disrule", "t student disrule.py")
+_chi2_rule = _load_script("chi2_distribution_slide_rule", "chi2_distribution_slide_rule -003.py")
+
+import power_analysis_slide_rule as _power_rule
+import discrete_distribution_slide_rule as _discrete_rule
+import empirical_slide_rule as _empirical_rule
+
+# Every renderer takes a spec dict (missing keys fall back to the script defaults) and returns SVG bytes
+RULE_RENDERERS = {
+    "z": _z_rule.render_enhanced_stat_slide_rule,
+    "t": _t_rule.render_t_distribution_slide_rule,
+    "chi2": _chi2_rule.render_chi2_distribution_slide_rule,
+    "power": _power_rule.render_power_analysis_slide_rule,
+    "discrete": _discrete_rule.render_discrete_distribution_slide_rule,
+    "empirical": _empirical_rule.render_empirical_slide_rule,
+}
+
+# Same kinds, stopping at the columnar TickTable so any tick_table backend can take it from there
+TABLE_BUILDERS = {
+    "z": _z_rule.build_enhanced_stat_tick_table,
+    "t": _t_rule.build_t_distribution_tick_table,
+    "chi2": _chi2_rule.build_chi2_distribution_tick_table,
+    "power": _power_rule.build_power_analysis_tick_table,
+    "discrete": _discrete_rule.build_discrete_distribution_tick_table,
+    "empirical": _empirical_rule.build_empirical_tick_table,
+}
+
+
+def build_tick_table(kind, spec=None):
+    try:
+        builder = TABLE_BUILDERS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown rule kind {kind!r}, expected one of {sorted(TABLE_BUILDERS)}") from None
+    return builder(spec)
+
+
+def render_rule(kind, spec=None):
+    try:
+        renderer = RULE_RENDERERS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown rule kind {kind!r}, expected one of {sorted(RULE_RENDERERS)}") from None
+    return renderer(spec)
+
+
+def render_rules(jobs, max_workers=None):
+    # jobs: iterable of (kind, spec); results come back in the same order
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda job: render_rule(*job), jobs))
+
+
+async def render_rule_async(kind, spec=None, executor=None):
+    # Runs the render in an executor so the event loop is never blocked
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, render_rule, kind, spec)
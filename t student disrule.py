@@ -1,30 +1,44 @@
 import numpy as np
 from scipy.stats import t as student_t
-from svgwrite import Drawing, rgb
+from svgwrite import rgb
+from tick_table import TickTableBuilder, table_to_svg
 import math
 
-def generate_t_distribution_slide_rule(output_file="t_distribution_slide_rule_enhanced.svg"):
-    # === CONFIGURABLE LINES: Define your 4 degrees of freedom here ===
-    df1 = 7    # ✅ CHANGE THIS VALUE AS NEEDED
-    df2 = 14   # ✅ CHANGE THIS VALUE AS NEEDED
-    df3 = 28   # ✅ CHANGE THIS VALUE AS NEEDED
-    df4 = 35  # ✅ CHANGE THIS VALUE AS NEEDED
-    
-    # Create list from these 4 variables
-    dfs = [df1, df2, df3, df4]
-    
+# === CONFIGURABLE DEFAULTS: any key can be overridden by passing a spec dict ===
+T_RULE_DEFAULTS = {
+    "dfs": (7, 14, 28, 35),  # ✅ CHANGE THESE VALUES AS NEEDED (one scale per df)
+    "width": 1800,
+    "height": 800,
+    "margin": 80,
+    "p_display_min": 0.001,
+    "p_display_max": 0.999,
+}
+
+
+def build_t_distribution_tick_table(spec=None):
+    # Builds the whole rule as a TickTable from spec only: no globals, no printing, no file access
+    spec = {**T_RULE_DEFAULTS, **(spec or {})}
+    dfs = list(spec["dfs"])
+    if not dfs:
+        raise ValueError("spec['dfs'] needs at least one degrees-of-freedom value")
+
     # Configuration
-    width, height = 1800, 800
-    margin = 80
+    width, height = spec["width"], spec["height"]
+    margin = spec["margin"]
     rule_width = width - 2 * margin
 
     # Adjusted probability display range
-    P_DISPLAY_MIN, P_DISPLAY_MAX = 0.001, 0.999
+    P_DISPLAY_MIN, P_DISPLAY_MAX = spec["p_display_min"], spec["p_display_max"]
     P_LOGIT_MIN, P_LOGIT_MAX = 0.0005, 0.9995
 
-    # Create SVG drawing
-    dwg = Drawing(output_file, size=(width, height), profile='full')
-    dwg.add(dwg.rect(insert=(0, 0), size=(width, height), fill=rgb(248, 248, 240)))
+    # Fixed vertical positions, one df line every 100 px
+    prob_y = 150
+    t_y_positions = [250 + 100 * i for i in range(len(dfs))]
+    height = max(height, t_y_positions[-1] + 250)
+
+    # Collect ticks and labels in a columnar tick table
+    table = TickTableBuilder(width, height)
+    table.add_decor("rect", insert=(0, 0), size=(width, height), fill=rgb(248, 248, 240))
 
     # Logit-based position mapping
     def p_to_position_logit(p):
@@ -40,39 +54,20 @@ def generate_t_distribution_slide_rule(output_file="t_distribution_slide_rule_en
 
     p_to_position = p_to_position_logit
 
-    # Fixed vertical positions for 4 df lines
-    prob_y = 150
-    t_y_positions = [250, 350, 450, 550]  # Fixed for df1, df2, df3, df4
-    
-    # Fixed colors for 4 df lines
+    # Colors cycle for the df lines
     t_colors = [rgb(255, 0, 0), rgb(0, 128, 0), rgb(0, 0, 255), rgb(128, 0, 128)]  # Red, Green, Blue, Purple
+    t_colors = [t_colors[i % len(t_colors)] for i in range(len(dfs))]
 
     # Draw probability baseline
-    dwg.add(dwg.line(start=(margin, prob_y), end=(width - margin, prob_y),
-                     stroke=rgb(0, 0, 0), stroke_width=2))
-    dwg.add(dwg.text("Probability (P)", insert=(width/2, prob_y - 30), text_anchor="middle",
-                     font_size=12, font_family="Arial", fill=rgb(0, 0, 0)))
-
-    # Draw t-distribution baselines - using df1, df2, df3, df4 explicitly
-    dwg.add(dwg.line(start=(margin, t_y_positions[0]), end=(width - margin, t_y_positions[0]),
-                     stroke=t_colors[0], stroke_width=2))
-    dwg.add(dwg.text(f"t-distribution (df={df1})", insert=(width/2, t_y_positions[0] - 30), 
-                     text_anchor="middle", font_size=12, font_family="Arial", fill=t_colors[0]))
-
-    dwg.add(dwg.line(start=(margin, t_y_positions[1]), end=(width - margin, t_y_positions[1]),
-                     stroke=t_colors[1], stroke_width=2))
-    dwg.add(dwg.text(f"t-distribution (df={df2})", insert=(width/2, t_y_positions[1] - 30), 
-                     text_anchor="middle", font_size=12, font_family="Arial", fill=t_colors[1]))
-
-    dwg.add(dwg.line(start=(margin, t_y_positions[2]), end=(width - margin, t_y_positions[2]),
-                     stroke=t_colors[2], stroke_width=2))
-    dwg.add(dwg.text(f"t-distribution (df={df3})", insert=(width/2, t_y_positions[2] - 30), 
-                     text_anchor="middle", font_size=12, font_family="Arial", fill=t_colors[2]))
-
-    dwg.add(dwg.line(start=(margin, t_y_positions[3]), end=(width - margin, t_y_positions[3]),
-                     stroke=t_colors[3], stroke_width=2))
-    dwg.add(dwg.text(f"t-distribution (df={df4})", insert=(width/2, t_y_positions[3] - 30), 
-                     text_anchor="middle", font_size=12, font_family="Arial", fill=t_colors[3]))
+    table.add_decor("line", start=(margin, prob_y), end=(width - margin, prob_y),
+                    stroke=rgb(0, 0, 0), stroke_width=2)
+    table.add_label("P", "Probability (P)", width/2, prob_y - 30, 12, rgb(0, 0, 0))
+
+    # Draw t-distribution baselines
+    for df, y_pos, color in zip(dfs, t_y_positions, t_colors):
+        table.add_decor("line", start=(margin, y_pos), end=(width - margin, y_pos),
+                        stroke=color, stroke_width=2)
+        table.add_label(f"t df={df}", f"t-distribution (df={df})", width/2, y_pos - 30, 12, color)
 
     # Probability ticks
     def add_probability_ticks():
@@ -87,13 +82,10 @@ def generate_t_distribution_slide_rule(output_file="t_distribution_slide_rule_en
                 tick_size, stroke_width, font_size = 12, 1.5, 9
             else:
                 tick_size, stroke_width, font_size = 8, 1.0, 8
-            dwg.add(dwg.line(start=(x_pos, prob_y), end=(x_pos, prob_y - tick_size),
-                             stroke=rgb(0, 0, 0), stroke_width=stroke_width))
+            tick = table.add_tick("P", x_pos, prob_y, -tick_size, rgb(0, 0, 0), stroke_width)
             if p >= 0.1 and p <= 0.9 or p in [0.001, 0.005, 0.01, 0.025, 0.05, 0.95, 0.975, 0.99, 0.995, 0.999]:
                 label = f"{p:.3f}" if (p < 0.1 or p > 0.9) else f"{p:.2f}"
-                dwg.add(dwg.text(label, insert=(x_pos, prob_y - tick_size - 10), 
-                                 text_anchor="middle", font_size=font_size, 
-                                 font_family="Arial", fill=rgb(0, 0, 0)))
+                table.add_label("P", label, x_pos, prob_y - tick_size - 10, font_size, rgb(0, 0, 0), tick=tick)
 
     def add_probability_minor_ticks():
         main_probs = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.975, 0.99, 0.995, 0.999]
@@ -107,19 +99,18 @@ def generate_t_distribution_slide_rule(output_file="t_distribution_slide_rule_en
                     p_minor = p1 + j * step
                     if P_DISPLAY_MIN <= p_minor <= P_DISPLAY_MAX:
                         x_pos = p_to_position(p_minor)
-                        dwg.add(dwg.line(start=(x_pos, prob_y), end=(x_pos, prob_y - 6),
-                                         stroke=rgb(0, 0, 0), stroke_width=0.7))
+                        table.add_tick("P", x_pos, prob_y, -6, rgb(0, 0, 0), 0.7)
             else:
                 step = (p2 - p1) / 4
                 for j in range(1, 4):
                     p_minor = p1 + j * step
                     if P_DISPLAY_MIN <= p_minor <= P_DISPLAY_MAX:
                         x_pos = p_to_position(p_minor)
-                        dwg.add(dwg.line(start=(x_pos, prob_y), end=(x_pos, prob_y - 4),
-                                         stroke=rgb(0, 0, 0), stroke_width=0.5))
+                        table.add_tick("P", x_pos, prob_y, -4, rgb(0, 0, 0), 0.5)
 
-    # === IMPROVED T-TICKS FUNCTION - using df1, df2, df3, df4 explicitly ===
+    # === IMPROVED T-TICKS FUNCTION ===
     def add_t_ticks(df, y_pos, color):
+        scale = f"t df={df}"
         t_candidates = np.arange(-5.0, 5.01, 0.1)
         
         def is_round_t(t_val):
@@ -147,9 +138,8 @@ def generate_t_distribution_slide_rule(output_file="t_distribution_slide_rule_en
             stroke_width = 1.8
             font_size = 9
             
-            dwg.add(dwg.line(start=(x_pos, y_pos), end=(x_pos, y_pos + tick_size),
-                             stroke=color, stroke_width=stroke_width))
-            
+            tick = table.add_tick(scale, x_pos, y_pos, tick_size, color, stroke_width)
+
             # Format label
             if abs(t_val) < 10:
                 if abs(t_val - round(t_val, 1)) < 1e-5:
@@ -158,9 +148,7 @@ def generate_t_distribution_slide_rule(output_file="t_distribution_slide_rule_en
                     t_label = f"{t_val:.2f}"
             else:
                 t_label = f"{t_val:.1f}"
-            dwg.add(dwg.text(t_label, insert=(x_pos, y_pos + tick_size + 12), 
-                             text_anchor="middle", font_size=font_size, 
-                             font_family="Arial", fill=color))
+            table.add_label(scale, t_label, x_pos, y_pos + tick_size + 12, font_size, color, tick=tick)
 
         # Add minor unmarked ticks
         for i in range(len(labeled_points) - 1):
@@ -177,81 +165,68 @@ def generate_t_distribution_slide_rule(output_file="t_distribution_slide_rule_en
                 if p_minor < P_DISPLAY_MIN or p_minor > P_DISPLAY_MAX:
                     continue
                 x_minor = p_to_position(p_minor)
-                dwg.add(dwg.line(start=(x_minor, y_pos), end=(x_minor, y_pos + 8),
-                                 stroke=color, stroke_width=0.7))
+                table.add_tick(scale, x_minor, y_pos, 8, color, 0.7)
 
-    # Add all ticks - using df1, df2, df3, df4 explicitly
-    add_t_ticks(df1, t_y_positions[0], t_colors[0])
-    add_t_ticks(df2, t_y_positions[1], t_colors[1])
-    add_t_ticks(df3, t_y_positions[2], t_colors[2])
-    add_t_ticks(df4, t_y_positions[3], t_colors[3])
+    # Add all ticks
+    for df, y_pos, color in zip(dfs, t_y_positions, t_colors):
+        add_t_ticks(df, y_pos, color)
 
     # Add probability ticks
     add_probability_ticks()
     add_probability_minor_ticks()
 
     # Title and info
-    dwg.add(dwg.text("Enhanced T-Distribution Slide Rule", insert=(width/2, 60), text_anchor="middle",
-                     font_size=18, font_family="Arial", font_weight="bold", fill=rgb(0, 0, 0)))
-    dwg.add(dwg.text("Expanded Probability Scale with Warped T-Distribution Scales", 
-                     insert=(width/2, 90), text_anchor="middle",
-                     font_size=12, font_family="Arial", fill=rgb(100, 100, 100)))
-
-    explanation_y = t_y_positions[3] + 80  # Using df4's y position
-    dwg.add(dwg.text("How to use: Align probability on top scale with corresponding t-value on any t-distribution scale", 
-                     insert=(width/2, explanation_y), text_anchor="middle",
-                     font_size=10, font_family="Arial", fill=rgb(80, 80, 80)))
-    dwg.add(dwg.text("Expanded extremes for higher precision in tail probabilities", 
-                     insert=(width/2, explanation_y + 20), text_anchor="middle",
-                     font_size=10, font_family="Arial", fill=rgb(80, 80, 80)))
-
-    # Legend - using df1, df2, df3, df4 explicitly
+    table.add_label("title", "Enhanced T-Distribution Slide Rule", width/2, 60, 18, rgb(0, 0, 0),
+                    font_weight="bold")
+    table.add_label("title", "Expanded Probability Scale with Warped T-Distribution Scales",
+                    width/2, 90, 12, rgb(100, 100, 100))
+
+    explanation_y = t_y_positions[-1] + 80  # Using the last df's y position
+    table.add_label("title", "How to use: Align probability on top scale with corresponding t-value on any t-distribution scale",
+                    width/2, explanation_y, 10, rgb(80, 80, 80))
+    table.add_label("title", "Expanded extremes for higher precision in tail probabilities",
+                    width/2, explanation_y + 20, 10, rgb(80, 80, 80))
+
+    # Legend
     legend_x = margin
-    legend_y = t_y_positions[3] + 120  # Using df4's y position
-    dwg.add(dwg.circle(center=(legend_x, legend_y), r=5, fill=t_colors[0]))
-    dwg.add(dwg.text(f"df = {df1}", insert=(legend_x + 15, legend_y + 5), 
-                     font_size=10, font_family="Arial", fill=t_colors[0]))
-    
-    legend_x += 120
-    dwg.add(dwg.circle(center=(legend_x, legend_y), r=5, fill=t_colors[1]))
-    dwg.add(dwg.text(f"df = {df2}", insert=(legend_x + 15, legend_y + 5), 
-                     font_size=10, font_family="Arial", fill=t_colors[1]))
-    
-    legend_x += 120
-    dwg.add(dwg.circle(center=(legend_x, legend_y), r=5, fill=t_colors[2]))
-    dwg.add(dwg.text(f"df = {df3}", insert=(legend_x + 15, legend_y + 5), 
-                     font_size=10, font_family="Arial", fill=t_colors[2]))
-    
-    legend_x += 120
-    dwg.add(dwg.circle(center=(legend_x, legend_y), r=5, fill=t_colors[3]))
-    dwg.add(dwg.text(f"df = {df4}", insert=(legend_x + 15, legend_y + 5), 
-                     font_size=10, font_family="Arial", fill=t_colors[3]))
+    legend_y = t_y_positions[-1] + 120  # Using the last df's y position
+    for df, color in zip(dfs, t_colors):
+        table.add_decor("circle", center=(legend_x, legend_y), r=5, fill=color)
+        table.add_label("legend", f"df = {df}", legend_x + 15, legend_y + 5, 10, color, text_anchor="start")
+        legend_x += 120
 
     # Bounding box
-    rule_box = dwg.rect(insert=(margin-10, prob_y-40), size=(rule_width+20, t_y_positions[3] - prob_y + 180),
-                        fill="none", stroke=rgb(200, 200, 200), stroke_width=1.5, rx=6, ry=6)
-    dwg.add(rule_box)
+    table.add_decor("rect", insert=(margin-10, prob_y-40), size=(rule_width+20, t_y_positions[-1] - prob_y + 180),
+                    fill="none", stroke=rgb(200, 200, 200), stroke_width=1.5, rx=6, ry=6)
+
+    return table.build()
+
+
+def render_t_distribution_slide_rule(spec=None):
+    # Pure and reentrant: returns the SVG document as bytes, safe to call from many threads
+    return table_to_svg(build_t_distribution_tick_table(spec))
+
+
+def write_t_distribution_slide_rule(stream, spec=None):
+    # Writes the SVG to any binary stream (file, socket, BytesIO, HTTP response body)
+    stream.write(render_t_distribution_slide_rule(spec))
+
 
-    dwg.save()
+def generate_t_distribution_slide_rule(output_file="t_distribution_slide_rule_enhanced.svg", spec=None):
+    spec = {**T_RULE_DEFAULTS, **(spec or {})}
+    with open(output_file, "wb") as f:
+        write_t_distribution_slide_rule(f, spec)
     print(f"Enhanced T-distribution slide rule saved as {output_file}")
-    print(f"Created with degrees of freedom: df1={df1}, df2={df2}, df3={df3}, df4={df4}")
+    print(f"Created with degrees of freedom: {', '.join(str(df) for df in spec['dfs'])}")
     print("Probability scale uses tuned logit expansion for balanced extreme/center spacing")
     print("T-scales now feature round-number labels and increased minor tick density")
 
 
 def generate_custom_t_slide_rule(df1=5, df2=12, df3=30, df4=100, output_file="custom_t_slide_rule_enhanced.svg"):
     # Wrapper function to allow passing df values as parameters
-    original_func = generate_t_distribution_slide_rule
-    # We'll need to modify the function to accept parameters, so let's create a temporary version
-    import types
-    def temp_func(output_file=output_file):
-        # Use the same configurable lines approach
-        globals()['df1'], globals()['df2'], globals()['df3'], globals()['df4'] = df1, df2, df3, df4
-        generate_t_distribution_slide_rule(output_file)
-    
-    temp_func(output_file)
+    generate_t_distribution_slide_rule(output_file, spec={"dfs": (df1, df2, df3, df4)})
 
 
 if __name__ == "__main__":
-    # This is the ONLY place you need to change df values
+    # Change df values in T_RULE_DEFAULTS at the top of this file
     generate_t_distribution_slide_rule()
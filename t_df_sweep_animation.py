@@ -0,0 +1,230 @@
+import numpy as np
+from scipy.stats import t as student_t, norm
+from probability_scale import logit_p_to_position
+import json
+
+# Positions are stored in 1/100 px so delta tracks are small integers
+POSITION_SCALE = 100
+# SMIL keyframes are dropped while linear interpolation stays within this many px
+KEYFRAME_TOLERANCE = 0.05
+
+# === CONFIGURABLE DEFAULTS: any key can be overridden by passing a spec dict ===
+T_SWEEP_DEFAULTS = {
+    "dfs": tuple(range(1, 501)),
+    "duration": 20.0,      # seconds for the whole sweep
+    "width": 1800,
+    "margin": 80,
+    "p_display_min": 0.001,
+    "p_display_max": 0.999,
+}
+
+
+def compute_t_sweep(spec):
+    # One batched CDF evaluation for every (df, tick) pair: rows are frames, columns are ticks
+    dfs = np.asarray(spec["dfs"], dtype=float)
+    tick_tenths = np.arange(-50, 51)
+    t_values = tick_tenths / 10.0
+    is_major = tick_tenths % 5 == 0
+
+    p_min, p_max = spec["p_display_min"], spec["p_display_max"]
+    p_to_position = logit_p_to_position(spec["margin"], spec["width"] - 2 * spec["margin"], p_min, p_max)
+
+    probs = student_t.cdf(t_values[np.newaxis, :], dfs[:, np.newaxis])
+    positions = p_to_position(probs)
+    visible = (probs >= p_min) & (probs <= p_max)
+    z_positions = p_to_position(norm.cdf(t_values))
+    z_visible = (norm.cdf(t_values) >= p_min) & (norm.cdf(t_values) <= p_max)
+
+    # Ticks never on the scale in any frame are dropped entirely
+    keep = visible.any(axis=0)
+    return {
+        "dfs": dfs,
+        "t_values": t_values[keep],
+        "is_major": is_major[keep],
+        "positions": positions[:, keep],
+        "visible": visible[:, keep],
+        "z_positions": z_positions[z_visible],
+        "z_t_values": t_values[z_visible],
+        "z_is_major": is_major[z_visible],
+        "p_to_position": p_to_position,
+    }
+
+
+def delta_encode_tracks(positions):
+    # Per tick: absolute first frame followed by frame-to-frame deltas, in 1/100 px integers
+    quantized = np.rint(positions * POSITION_SCALE).astype(np.int64)
+    deltas = np.diff(quantized, axis=0)
+    return [[int(quantized[0, i])] + deltas[:, i].tolist() for i in range(quantized.shape[1])]
+
+
+def thin_keyframes(track, tolerance=KEYFRAME_TOLERANCE):
+    # Greedy keyframe reduction: keep a frame only when linear interpolation from the last kept
+    # frame would miss some frame in between by more than the tolerance
+    n = len(track)
+    kept = [0]
+    anchor = 0
+    for candidate in range(2, n):
+        span = np.arange(anchor, candidate + 1)
+        line = track[anchor] + (track[candidate] - track[anchor]) * (span - anchor) / (candidate - anchor)
+        if np.max(np.abs(line - track[anchor:candidate + 1])) > tolerance:
+            kept.append(candidate - 1)
+            anchor = candidate - 1
+    if n > 1:
+        kept.append(n - 1)
+    return kept
+
+
+def _static_svg_parts(spec, sweep, height):
+    width, margin = spec["width"], spec["margin"]
+    prob_y, t_y, z_y = 150, 250, 350
+    parts = [f'<rect x="0" y="0" width="{width}" height="{height}" fill="rgb(248,248,240)"/>',
+             f'<text x="{width/2}" y="60" text-anchor="middle" font-size="18" font-family="Arial" '
+             f'font-weight="bold">t-Distribution Converging to z</text>',
+             f'<line x1="{margin}" y1="{prob_y}" x2="{width - margin}" y2="{prob_y}" stroke="rgb(0,0,0)" stroke-width="2"/>',
+             f'<text x="{width/2}" y="{prob_y - 30}" text-anchor="middle" font-size="12" font-family="Arial">Probability (P)</text>',
+             f'<line x1="{margin}" y1="{t_y}" x2="{width - margin}" y2="{t_y}" stroke="rgb(255,0,0)" stroke-width="2"/>',
+             f'<text id="df-label" x="{width/2}" y="{t_y - 30}" text-anchor="middle" font-size="12" '
+             f'font-family="Arial" fill="rgb(255,0,0)">t-distribution (df={int(sweep["dfs"][0])})</text>',
+             f'<line x1="{margin}" y1="{z_y}" x2="{width - margin}" y2="{z_y}" stroke="rgb(0,0,255)" stroke-width="2"/>',
+             f'<text x="{width/2}" y="{z_y - 30}" text-anchor="middle" font-size="12" font-family="Arial" '
+             f'fill="rgb(0,0,255)">Standard normal (z), the df limit</text>']
+    for p in [0.001, 0.01, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99, 0.999]:
+        x_pos = float(sweep["p_to_position"](p))
+        label = f"{p:.3f}" if (p < 0.1 or p > 0.9) else f"{p:.2f}"
+        parts.append(f'<line x1="{x_pos:.2f}" y1="{prob_y}" x2="{x_pos:.2f}" y2="{prob_y - 12}" '
+                     f'stroke="rgb(0,0,0)" stroke-width="1.5"/>')
+        parts.append(f'<text x="{x_pos:.2f}" y="{prob_y - 22}" text-anchor="middle" font-size="9" '
+                     f'font-family="Arial">{label}</text>')
+    for t_val, x_pos, major in zip(sweep["z_t_values"], sweep["z_positions"], sweep["z_is_major"]):
+        size, stroke = (12, 1.8) if major else (6, 0.7)
+        parts.append(f'<line x1="{x_pos:.2f}" y1="{z_y}" x2="{x_pos:.2f}" y2="{z_y + size}" '
+                     f'stroke="rgb(0,0,255)" stroke-width="{stroke}"/>')
+        if major:
+            parts.append(f'<text x="{x_pos:.2f}" y="{z_y + size + 12}" text-anchor="middle" font-size="9" '
+                         f'font-family="Arial" fill="rgb(0,0,255)">{t_val:.1f}</text>')
+    return parts, t_y
+
+
+def _tick_markup(t_val, major, t_y):
+    # Tick drawn at x=0 inside a group that is translated along the scale
+    size, stroke = (12, 1.8) if major else (6, 0.7)
+    markup = f'<line x1="0" y1="{t_y}" x2="0" y2="{t_y + size}" stroke="rgb(255,0,0)" stroke-width="{stroke}"/>'
+    if major:
+        markup += (f'<text x="0" y="{t_y + size + 12}" text-anchor="middle" font-size="9" '
+                   f'font-family="Arial" fill="rgb(255,0,0)">{t_val:.1f}</text>')
+    return markup
+
+
+def render_t_sweep_html(spec=None):
+    # HTML page with one inline SVG; each tick is a delta-encoded keyframe track decoded in the browser
+    spec = {**T_SWEEP_DEFAULTS, **(spec or {})}
+    sweep = compute_t_sweep(spec)
+    height = 450
+    static_parts, t_y = _static_svg_parts(spec, sweep, height)
+    ticks = [f'<g class="tick">{_tick_markup(t, m, t_y)}</g>'
+             for t, m in zip(sweep["t_values"], sweep["is_major"])]
+    payload = {
+        "dfs": [int(df) if float(df).is_integer() else float(df) for df in sweep["dfs"]],
+        "scale": POSITION_SCALE,
+        "tracks": delta_encode_tracks(sweep["positions"]),
+        # Hidden frames as [start, end) runs per tick, usually empty or one run
+        "hidden": [_runs(~sweep["visible"][:, i]) for i in range(sweep["visible"].shape[1])],
+        "duration": spec["duration"],
+    }
+    script = """
+const data = JSON.parse(document.getElementById('sweep-data').textContent);
+const ticks = document.querySelectorAll('g.tick');
+const frames = data.dfs.length;
+const tracks = data.tracks.map(track => {
+  const xs = new Float32Array(frames);
+  let acc = 0;
+  for (let i = 0; i < frames; i++) { acc += track[i]; xs[i] = acc / data.scale; }
+  return xs;
+});
+const hidden = data.hidden.map(runs => {
+  const mask = new Uint8Array(frames);
+  for (const [a, b] of runs) mask.fill(1, a, b);
+  return mask;
+});
+const label = document.getElementById('df-label');
+const slider = document.getElementById('df-slider');
+slider.max = frames - 1;
+function show(frame) {
+  for (let i = 0; i < ticks.length; i++) {
+    ticks[i].setAttribute('transform', 'translate(' + tracks[i][frame] + ',0)');
+    ticks[i].style.display = hidden[i][frame] ? 'none' : '';
+  }
+  label.textContent = 't-distribution (df=' + data.dfs[frame] + ')';
+  slider.value = frame;
+}
+let start = null, playing = true;
+function step(now) {
+  if (start === null) start = now;
+  const frame = Math.min(frames - 1, Math.floor((now - start) / 1000 / data.duration * frames));
+  show(frame);
+  if (playing && frame < frames - 1) requestAnimationFrame(step);
+}
+slider.addEventListener('input', () => { playing = false; show(+slider.value); });
+requestAnimationFrame(step);
+"""
+    html = ('<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>t to z sweep</title></head><body>\n'
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{spec["width"]}" height="{height}">'
+            + "".join(static_parts) + "".join(ticks) + '</svg>\n'
+            '<div><input id="df-slider" type="range" min="0" value="0" style="width:600px"></div>\n'
+            f'<script id="sweep-data" type="application/json">{json.dumps(payload, separators=(",", ":"))}</script>\n'
+            f'<script>{script}</script>\n</body></html>\n')
+    return html.encode("utf-8")
+
+
+def _runs(mask):
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return [[int(a), int(b)] for a, b in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1))]
+
+
+def render_t_sweep_svg(spec=None):
+    # Standalone SMIL-animated SVG; keyframes are thinned per tick instead of stored for every df
+    spec = {**T_SWEEP_DEFAULTS, **(spec or {})}
+    sweep = compute_t_sweep(spec)
+    height = 450
+    parts, t_y = _static_svg_parts(spec, sweep, height)
+    n_frames = len(sweep["dfs"])
+    duration = spec["duration"]
+    # The df label cannot be animated per frame cheaply, so it shows the sweep range
+    parts = [p.replace(f'(df={int(sweep["dfs"][0])})', f'(df={int(sweep["dfs"][0])}..{int(sweep["dfs"][-1])})')
+             for p in parts]
+
+    for i, (t_val, major) in enumerate(zip(sweep["t_values"], sweep["is_major"])):
+        track = sweep["positions"][:, i]
+        kept = thin_keyframes(track)
+        key_times = ";".join(f"{k / max(n_frames - 1, 1):.4f}" for k in kept)
+        values = ";".join(f"{track[k]:.2f},0" for k in kept)
+        visible = sweep["visible"][:, i]
+        markup = _tick_markup(t_val, major, t_y)
+        animation = (f'<animateTransform attributeName="transform" type="translate" values="{values}" '
+                     f'keyTimes="{key_times}" dur="{duration}s" fill="freeze"/>')
+        if not visible.all():
+            # Discrete visibility: switch display at the frames where the tick enters or leaves
+            switches = [0] + [int(k) for k in np.flatnonzero(np.diff(visible.astype(np.int8))) + 1]
+            display_values = ";".join("inline" if visible[k] else "none" for k in switches)
+            display_times = ";".join(f"{k / max(n_frames - 1, 1):.4f}" for k in switches)
+            animation += (f'<animate attributeName="display" values="{display_values}" '
+                          f'keyTimes="{display_times}" calcMode="discrete" dur="{duration}s" fill="freeze"/>')
+        parts.append(f'<g>{animation}{markup}</g>')
+
+    svg = (f'<?xml version="1.0" encoding="utf-8" ?>\n<svg xmlns="http://www.w3.org/2000/svg" '
+           f'width="{spec["width"]}" height="{height}">' + "".join(parts) + '</svg>\n')
+    return svg.encode("utf-8")
+
+
+def generate_t_sweep_animation(output_file="t_df_sweep.html", spec=None):
+    render = render_t_sweep_svg if output_file.endswith(".svg") else render_t_sweep_html
+    data = render(spec)
+    with open(output_file, "wb") as f:
+        f.write(data)
+    dfs = (spec or {}).get("dfs", T_SWEEP_DEFAULTS["dfs"])
+    print(f"t-distribution df sweep animation saved as {output_file}")
+    print(f"{len(dfs)} frames (df={dfs[0]}..{dfs[-1]}) in {len(data) / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    generate_t_sweep_animation()
@@ -0,0 +1,82 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from empirical_slide_rule import TDigest, sketch_sources
+
+TAIL_QUANTILES = [0.001, 0.01, 0.5, 0.99, 0.999]
+# Rank error allowed, relative to min(q, 1 - q)
+RANK_TOLERANCE = 0.05
+
+
+def _relative_rank_error(sorted_data, value, q):
+    rank = np.searchsorted(sorted_data, value) / len(sorted_data)
+    return abs(rank - q) / min(q, 1 - q)
+
+
+@pytest.fixture(scope="module")
+def skewed_data():
+    return np.random.default_rng(1).lognormal(size=200_000)
+
+
+def test_std_of_large_offset_data():
+    data = 1e9 + np.tile([-1.0, 1.0], 5000)
+    assert TDigest().update(data).std == pytest.approx(1.0, rel=1e-9)
+    merged = TDigest().merge(TDigest().update(data[:3001])).merge(TDigest().update(data[3001:]))
+    assert merged.std == pytest.approx(1.0, rel=1e-9)
+    assert merged.mean == pytest.approx(1e9, rel=1e-15)
+
+
+@pytest.mark.parametrize("mode", ["streamed", "merged"])
+def test_tail_quantiles_within_relative_rank(skewed_data, mode):
+    sketch = TDigest()
+    if mode == "streamed":
+        for chunk in np.array_split(skewed_data, 50):
+            sketch.update(chunk)
+    else:
+        for part in np.array_split(skewed_data, 8):
+            sketch.merge(TDigest().update(part))
+    assert sketch.n == len(skewed_data)
+    sorted_data = np.sort(skewed_data)
+    for q in TAIL_QUANTILES:
+        assert _relative_rank_error(sorted_data, sketch.quantile(q), q) <= RANK_TOLERANCE
+
+
+@pytest.mark.parametrize("workers", [1, 3, 7])
+def test_csv_ranges_count_every_row_once(tmp_path, workers):
+    # Rows of varying width so the byte-range boundaries land mid-row
+    values = np.arange(1, 2001)
+    path = tmp_path / "scores.csv"
+    with open(path, "w") as f:
+        f.write("score,id\n")
+        for value in values:
+            f.write(f"{value},{'x' * (value % 13)}\n")
+    sketch = sketch_sources([str(path)], max_workers=workers)
+    assert sketch.n == len(values)
+    assert sketch.mean == pytest.approx(values.mean())
+    assert (sketch.min, sketch.max) == (1, 2000)
+
+
+def test_npy_ranges_count_every_row_once(tmp_path):
+    data = np.random.default_rng(2).normal(size=(5000, 2))
+    path = tmp_path / "scores.npy"
+    np.save(path, data)
+    sketch = sketch_sources(path, column=1, max_workers=3)
+    assert sketch.n == len(data)
+    assert sketch.mean == pytest.approx(data[:, 1].mean())
+
+
+def test_sources_mix_paths_and_arrays(tmp_path):
+    chunks = [np.arange(100.0), np.arange(100.0, 250.0)]
+    path = tmp_path / "more.csv"
+    np.savetxt(path, np.arange(250.0, 300.0), header="value", comments="")
+    assert sketch_sources(chunks).n == 250
+    assert sketch_sources(iter(chunks)).n == 250
+    assert sketch_sources(chunks[0]).n == 100
+    assert sketch_sources(str(path)).n == 50
+    mixed = sketch_sources(chunks + [str(path)], max_workers=2)
+    assert (mixed.n, mixed.min, mixed.max) == (300, 0.0, 299.0)
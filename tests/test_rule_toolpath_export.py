@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rule_toolpath_export import (TOOLPATH_LAYERS, classify_segment, estimate_machine_time,
+                                  merge_collinear_segments, plan_toolpath, table_segments)
+from statrule_render import build_tick_table
+
+
+def _naive_plan(segments, layers=TOOLPATH_LAYERS):
+    # Every line in emitted order, one layer after another
+    plan = []
+    for layer in layers:
+        cuts = [s[:4] for s in segments if classify_segment(s, layers) == layer["name"]]
+        if cuts:
+            plan.append((layer, cuts))
+    return plan
+
+
+def test_overlapping_collinear_cuts_merge():
+    horizontal = merge_collinear_segments([(10.0, 50.0, 60.0, 50.0), (40.0, 50.0, 120.0, 50.0)])
+    assert horizontal == [(10.0, 50.0, 120.0, 50.0)]
+    vertical = merge_collinear_segments([(30.0, 80.0, 30.0, 20.0), (30.0, 10.0, 30.0, 40.0)])
+    assert vertical == [(30.0, 10.0, 30.0, 80.0)]
+
+
+def test_separate_collinear_cuts_stay_apart():
+    merged = merge_collinear_segments([(10.0, 50.0, 20.0, 50.0), (30.0, 50.0, 40.0, 50.0)])
+    assert sorted(merged) == [(10.0, 50.0, 20.0, 50.0), (30.0, 50.0, 40.0, 50.0)]
+
+
+@pytest.mark.parametrize("kind", ["z", "chi2"])
+def test_plan_is_no_slower_than_emitted_order(kind):
+    segments, _ = table_segments(build_tick_table(kind))
+    plan = plan_toolpath(segments)
+    assert sum(len(cuts) for _, cuts in plan) <= len(segments)
+    assert estimate_machine_time(plan) <= estimate_machine_time(_naive_plan(segments))
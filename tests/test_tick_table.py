@@ -0,0 +1,104 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rule_tile_pyramid import RuleTilePyramid
+from rule_toolpath_export import export_rule_toolpath
+from statrule_render import build_tick_table
+from tick_table import (LABEL_DTYPE, TICK_DTYPE, TickTable, TickTableBuilder, load_arrow, load_npz,
+                        save_arrow, save_npz, table_to_compact_svg, table_to_svg)
+
+RULE_KINDS = ["z", "t", "chi2", "discrete"]
+
+
+def _reload_npz(table, tmp_path, mmap=True):
+    path = str(tmp_path / "table.npz")
+    save_npz(table, path)
+    return load_npz(path, mmap=mmap)
+
+
+def _reload_arrow(table, tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "table.arrow")
+    save_arrow(table, path)
+    return load_arrow(path)
+
+
+RELOADERS = {
+    "npz": _reload_npz,
+    "npz-copy": lambda table, tmp_path: _reload_npz(table, tmp_path, mmap=False),
+    "arrow": _reload_arrow,
+}
+
+
+def _empty_scale_table():
+    builder = TickTableBuilder(200, 100)
+    builder.add_decor("rect", insert=(0, 0), size=(200, 100), fill="white")
+    builder.add_label("title", "labels only", 100, 20, 12, "black")
+    tick = builder.add_tick("P", 50.0, 60.0, -8.0, "black", 1.5)
+    builder.add_label("P", "0.50", 50.0, 42.0, 9, "black", tick=tick)
+    table = builder.build()
+    table.scales["empty"] = {"ticks": np.empty(0, dtype=TICK_DTYPE), "labels": np.empty(0, dtype=LABEL_DTYPE)}
+    return table
+
+
+@pytest.fixture(scope="module", params=RULE_KINDS)
+def rule_table(request):
+    return build_tick_table(request.param)
+
+
+@pytest.mark.parametrize("reload", sorted(RELOADERS))
+def test_round_trip_renders_identical_svg(rule_table, reload, tmp_path):
+    loaded = RELOADERS[reload](rule_table, tmp_path)
+    assert list(loaded.scales) == list(rule_table.scales)
+    assert loaded.n_ticks == rule_table.n_ticks
+    assert table_to_svg(loaded) == table_to_svg(rule_table)
+    assert table_to_compact_svg(loaded) == table_to_compact_svg(rule_table)
+
+
+@pytest.mark.parametrize("reload", sorted(RELOADERS))
+def test_round_trip_empty_scales(reload, tmp_path):
+    table = _empty_scale_table()
+    loaded = RELOADERS[reload](table, tmp_path)
+    assert list(loaded.scales) == ["P", "title", "empty"]
+    assert len(loaded.scales["empty"]["ticks"]) == 0
+    assert len(loaded.scales["title"]["ticks"]) == 0
+    assert table_to_svg(loaded) == table_to_svg(table)
+
+
+@pytest.mark.parametrize("reload", sorted(RELOADERS))
+def test_round_trip_table_without_scales(reload, tmp_path):
+    table = TickTable(100, 50, {}, [], [], [], [("rect", {"insert": [0, 0], "size": [100, 50]})])
+    loaded = RELOADERS[reload](table, tmp_path)
+    assert loaded.n_ticks == 0
+    assert table_to_svg(loaded) == table_to_svg(table)
+
+
+@pytest.mark.parametrize("reload", sorted(RELOADERS))
+def test_tile_pyramid_from_reloaded_table(reload, tmp_path):
+    table = build_tick_table("t")
+    original = RuleTilePyramid.from_table(table, max_level=2)
+    loaded = RuleTilePyramid.from_table(RELOADERS[reload](table, tmp_path), max_level=2)
+    assert loaded.rule_id == original.rule_id
+    for level in range(3):
+        cols, rows = original.grid_size(level)
+        for col in range(cols):
+            for row in range(rows):
+                assert loaded.tile(level, col, row) == original.tile(level, col, row)
+
+
+@pytest.mark.parametrize("reload", sorted(RELOADERS))
+def test_toolpath_from_reloaded_table(reload, tmp_path):
+    table = build_tick_table("chi2")
+    loaded = RELOADERS[reload](table, tmp_path)
+    outputs = []
+    for name, source in (("original", table), ("loaded", loaded)):
+        dxf_file, gcode_file = str(tmp_path / f"{name}.dxf"), str(tmp_path / f"{name}.gcode")
+        export_rule_toolpath(source, dxf_file, gcode_file)
+        with open(dxf_file) as dxf, open(gcode_file) as gcode:
+            outputs.append((dxf.read(), gcode.read()))
+    assert outputs[0] == outputs[1]
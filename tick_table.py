@@ -0,0 +1,331 @@
+import numpy as np
+from svgwrite import Drawing
+import io
+import json
+import struct
+import zipfile
+
+# One row per tick: 17 bytes. length is signed, negative ticks point up from the baseline.
+# label is a row index into the same scale's label array, -1 when the tick has no label.
+TICK_DTYPE = np.dtype([("x", "<f4"), ("y", "<f4"), ("length", "<f4"), ("stroke_class", "u1"), ("label", "<i4")])
+
+# One row per label: 15 bytes. text indexes the shared string pool, style the label style table.
+LABEL_DTYPE = np.dtype([("x", "<f4"), ("y", "<f4"), ("rotation", "<i2"), ("style", "u1"), ("text", "<i4")])
+
+
+class TickTable:
+    # Columnar intermediate representation of a rendered rule.
+    #   scales:        {name: {"ticks": TICK_DTYPE array, "labels": LABEL_DTYPE array}}
+    #   stroke_classes: [(stroke color, stroke width)], indexed by ticks["stroke_class"]
+    #   label_styles:  [(fill, font size, text anchor, font weight)], indexed by labels["style"]
+    #   pool:          label strings, indexed by labels["text"]
+    #   decor:         [(tag, attrs)] for the few non-tick shapes (background, baselines, boxes, legend)
+
+    def __init__(self, width, height, scales, stroke_classes, label_styles, pool, decor):
+        self.width = width
+        self.height = height
+        self.scales = scales
+        self.stroke_classes = stroke_classes
+        self.label_styles = label_styles
+        self.pool = pool
+        self.decor = decor
+
+    @property
+    def n_ticks(self):
+        return sum(len(scale["ticks"]) for scale in self.scales.values())
+
+    @property
+    def nbytes(self):
+        return sum(scale["ticks"].nbytes + scale["labels"].nbytes for scale in self.scales.values())
+
+    def tick_segments(self):
+        # (x1, y1, x2, y2, stroke_width) for every tick, scale by scale
+        for scale in self.scales.values():
+            ticks = scale["ticks"]
+            widths = np.array([w for _, w in self.stroke_classes], dtype=np.float32)[ticks["stroke_class"]] \
+                if len(ticks) else np.empty(0, dtype=np.float32)
+            for x, y, length, width in zip(ticks["x"].tolist(), ticks["y"].tolist(),
+                                           ticks["length"].tolist(), widths.tolist()):
+                yield x, y, x, y + length, width
+
+    def decor_segments(self):
+        # Solid decor lines (baselines, end marks); dashed guides are not geometry
+        for tag, attrs in self.decor:
+            if tag == "line" and not attrs.get("stroke_dasharray"):
+                (x1, y1), (x2, y2) = attrs["start"], attrs["end"]
+                yield x1, y1, x2, y2, attrs.get("stroke_width", 1)
+
+
+class TickTableBuilder:
+    # Collects ticks and labels while a generator runs, then packs them into a TickTable
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self._ticks = {}
+        self._labels = {}
+        self._stroke_classes = {}
+        self._label_styles = {}
+        self._pool = {}
+        self._decor = []
+
+    def _stroke_class(self, stroke, stroke_width):
+        key = (str(stroke), float(stroke_width))
+        if key not in self._stroke_classes:
+            if len(self._stroke_classes) == 256:
+                raise ValueError("A tick table supports at most 256 stroke classes")
+            self._stroke_classes[key] = len(self._stroke_classes)
+        return self._stroke_classes[key]
+
+    def add_tick(self, scale, x, y, length, stroke, stroke_width):
+        ticks = self._ticks.setdefault(scale, [])
+        ticks.append((x, y, length, self._stroke_class(stroke, stroke_width), -1))
+        return len(ticks) - 1
+
+    def add_ticks(self, scale, xs, y, length, stroke, stroke_width):
+        # Vectorized: many ticks of one class on one baseline
+        stroke_class = self._stroke_class(stroke, stroke_width)
+        ticks = self._ticks.setdefault(scale, [])
+        ticks.extend((float(x), y, length, stroke_class, -1) for x in np.asarray(xs).tolist())
+
+    def add_label(self, scale, text, x, y, font_size, fill, text_anchor="middle", rotation=0,
+                  font_weight="normal", tick=None):
+        style_key = (str(fill), float(font_size), text_anchor, font_weight)
+        if style_key not in self._label_styles:
+            if len(self._label_styles) == 256:
+                raise ValueError("A tick table supports at most 256 label styles")
+            self._label_styles[style_key] = len(self._label_styles)
+        text_index = self._pool.setdefault(text, len(self._pool))
+        labels = self._labels.setdefault(scale, [])
+        labels.append((x, y, rotation, self._label_styles[style_key], text_index))
+        if tick is not None:
+            x_, y_, length, stroke_class, _ = self._ticks[scale][tick]
+            self._ticks[scale][tick] = (x_, y_, length, stroke_class, len(labels) - 1)
+        return len(labels) - 1
+
+    def add_decor(self, tag, **attrs):
+        self._decor.append((tag, attrs))
+
+    def build(self):
+        scales = {}
+        for name in list(self._ticks) + [n for n in self._labels if n not in self._ticks]:
+            scales[name] = {
+                "ticks": np.array(self._ticks.get(name, []), dtype=TICK_DTYPE),
+                "labels": np.array(self._labels.get(name, []), dtype=LABEL_DTYPE),
+            }
+        return TickTable(self.width, self.height, scales,
+                         [key for key, _ in sorted(self._stroke_classes.items(), key=lambda kv: kv[1])],
+                         [key for key, _ in sorted(self._label_styles.items(), key=lambda kv: kv[1])],
+                         list(self._pool), list(self._decor))
+
+
+# === SVG BACKENDS ===
+def _decor_drawing(table):
+    dwg = Drawing(size=(table.width, table.height), profile='full')
+    for tag, attrs in table.decor:
+        dwg.add(getattr(dwg, tag)(**attrs))
+    return dwg
+
+
+def table_to_svg(table):
+    # Full SVG, one <line>/<text> element per tick and label (same markup as the original generators)
+    dwg = _decor_drawing(table)
+    for scale in table.scales.values():
+        ticks = scale["ticks"]
+        for x, y, length, stroke_class in zip(ticks["x"].tolist(), ticks["y"].tolist(),
+                                              ticks["length"].tolist(), ticks["stroke_class"].tolist()):
+            stroke, stroke_width = table.stroke_classes[stroke_class]
+            dwg.add(dwg.line(start=(x, y), end=(x, y + length), stroke=stroke, stroke_width=stroke_width))
+    for scale in table.scales.values():
+        labels = scale["labels"]
+        for x, y, rotation, style, text in zip(labels["x"].tolist(), labels["y"].tolist(),
+                                               labels["rotation"].tolist(), labels["style"].tolist(),
+                                               labels["text"].tolist()):
+            fill, font_size, anchor, weight = table.label_styles[style]
+            element = dwg.text(table.pool[text], insert=(x, y), text_anchor=anchor, font_size=font_size,
+                               font_family="Arial", font_weight=weight, fill=fill)
+            if rotation:
+                element.rotate(rotation, (x, y))
+            dwg.add(element)
+    buffer = io.StringIO()
+    dwg.write(buffer)
+    return buffer.getvalue().encode("utf-8")
+
+
+def table_to_compact_svg(table):
+    # Compact SVG: one <path> per (scale, stroke class) and one <g> per label style
+    dwg = _decor_drawing(table)
+    body = []
+    for scale in table.scales.values():
+        ticks = scale["ticks"]
+        for stroke_class in np.unique(ticks["stroke_class"]).tolist():
+            rows = ticks[ticks["stroke_class"] == stroke_class]
+            stroke, stroke_width = table.stroke_classes[stroke_class]
+            d = "".join(f"M{x:.2f} {y:.2f}v{length:.2f}" for x, y, length in
+                        zip(rows["x"].tolist(), rows["y"].tolist(), rows["length"].tolist()))
+            body.append(f'<path d="{d}" stroke="{stroke}" stroke-width="{stroke_width:g}" fill="none"/>')
+    for style, (fill, font_size, anchor, weight) in enumerate(table.label_styles):
+        texts = []
+        for scale in table.scales.values():
+            labels = scale["labels"][scale["labels"]["style"] == style]
+            for x, y, rotation, text in zip(labels["x"].tolist(), labels["y"].tolist(),
+                                            labels["rotation"].tolist(), labels["text"].tolist()):
+                rotate = f' transform="rotate({rotation},{x:.2f},{y:.2f})"' if rotation else ""
+                texts.append(f'<text x="{x:.2f}" y="{y:.2f}"{rotate}>{_escape(table.pool[text])}</text>')
+        if texts:
+            body.append(f'<g fill="{fill}" font-size="{font_size:g}" text-anchor="{anchor}" '
+                        f'font-weight="{weight}" font-family="Arial">' + "".join(texts) + '</g>')
+    svg = dwg.tostring()
+    return (svg[:svg.rindex("</svg>")] + "".join(body) + "</svg>").encode("utf-8")
+
+
+def _escape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def table_to_png(table, output_file, scale=1.0):
+    try:
+        import cairosvg
+    except ImportError:
+        raise ImportError("PNG output needs cairosvg (pip install cairosvg)") from None
+    cairosvg.svg2png(bytestring=table_to_compact_svg(table), write_to=output_file, scale=scale)
+
+
+def table_to_pdf(table, output_file):
+    try:
+        import cairosvg
+    except ImportError:
+        raise ImportError("PDF output needs cairosvg (pip install cairosvg)") from None
+    cairosvg.svg2pdf(bytestring=table_to_compact_svg(table), write_to=output_file)
+
+
+# === SERIALIZATION ===
+def _meta(table):
+    return {"width": table.width, "height": table.height, "scales": list(table.scales),
+            "stroke_classes": table.stroke_classes, "label_styles": table.label_styles,
+            "decor": table.decor}
+
+
+def _pool_arrays(pool):
+    encoded = [text.encode("utf-8") for text in pool]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _pool_from_arrays(data, offsets):
+    raw = bytes(data)
+    return [raw[a:b].decode("utf-8") for a, b in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def _from_meta(meta, scales, pool):
+    return TickTable(meta["width"], meta["height"], scales,
+                     [tuple(c) for c in meta["stroke_classes"]], [tuple(s) for s in meta["label_styles"]],
+                     pool, [(tag, attrs) for tag, attrs in meta["decor"]])
+
+
+def save_npz(table, path):
+    # Uncompressed .npz so load_npz can memory-map every array in place
+    arrays = {}
+    for i, scale in enumerate(table.scales.values()):
+        arrays[f"ticks_{i}"] = scale["ticks"]
+        arrays[f"labels_{i}"] = scale["labels"]
+    arrays["pool_data"], arrays["pool_offsets"] = _pool_arrays(table.pool)
+    arrays["meta"] = np.frombuffer(json.dumps(_meta(table)).encode("utf-8"), dtype=np.uint8)
+    np.savez(path, **arrays)
+
+
+def _memmap_npz(path):
+    # Zero-copy: .npz members are stored uncompressed, so each array is a memmap at its file offset
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path} is compressed, save it with save_npz to memory-map it")
+            f.seek(info.header_offset)
+            name_length, extra_length = struct.unpack("<HH", f.read(30)[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if 0 in shape:
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                                         order="F" if fortran_order else "C")
+    return arrays
+
+
+def load_npz(path, mmap=True):
+    arrays = _memmap_npz(path) if mmap else dict(np.load(path))
+    meta = json.loads(bytes(arrays["meta"]).decode("utf-8"))
+    scales = {name: {"ticks": arrays[f"ticks_{i}"], "labels": arrays[f"labels_{i}"]}
+              for i, name in enumerate(meta["scales"])}
+    return _from_meta(meta, scales, _pool_from_arrays(arrays["pool_data"], arrays["pool_offsets"]))
+
+
+def save_arrow(table, path):
+    # Arrow IPC file: all scales in two record batches, scale boundaries kept in the schema metadata
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Arrow output needs pyarrow (pip install pyarrow)") from None
+    meta = _meta(table)
+    meta["pool"] = table.pool
+    meta["tick_offsets"] = np.cumsum([0] + [len(s["ticks"]) for s in table.scales.values()]).tolist()
+    meta["label_offsets"] = np.cumsum([0] + [len(s["labels"]) for s in table.scales.values()]).tolist()
+    ticks = np.concatenate([s["ticks"] for s in table.scales.values()]) if table.scales else np.empty(0, TICK_DTYPE)
+    labels = np.concatenate([s["labels"] for s in table.scales.values()]) if table.scales else np.empty(0, LABEL_DTYPE)
+    n_rows = max(len(ticks), len(labels))
+    columns = {}
+    # One batch, columns padded to a common length; real lengths are in the offsets
+    for prefix, array in (("tick_", ticks), ("label_", labels)):
+        for field in array.dtype.names:
+            column = np.zeros(n_rows, dtype=array.dtype[field])
+            column[:len(array)] = array[field]
+            columns[prefix + field] = pa.array(column)
+    schema_meta = {b"statrule": json.dumps(meta).encode("utf-8")}
+    batch = pa.RecordBatch.from_pydict(columns).replace_schema_metadata(schema_meta)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+
+
+def load_arrow(path):
+    # Memory-mapped Arrow reload: every column is a zero-copy NumPy view of the mapped file
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Arrow input needs pyarrow (pip install pyarrow)") from None
+    reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+    batch = reader.get_batch(0)
+    meta = json.loads(reader.schema.metadata[b"statrule"].decode("utf-8"))
+    column = lambda name: batch.column(name).to_numpy(zero_copy_only=True)
+    tick_columns = {f: column("tick_" + f) for f in TICK_DTYPE.names}
+    label_columns = {f: column("label_" + f) for f in LABEL_DTYPE.names}
+    scales = {}
+    for i, name in enumerate(meta["scales"]):
+        t0, t1 = meta["tick_offsets"][i], meta["tick_offsets"][i + 1]
+        l0, l1 = meta["label_offsets"][i], meta["label_offsets"][i + 1]
+        # Columnar views; backends only index fields, so a dict of columns stands in for the record array
+        scales[name] = {"ticks": _ColumnView({f: c[t0:t1] for f, c in tick_columns.items()}),
+                        "labels": _ColumnView({f: c[l0:l1] for f, c in label_columns.items()})}
+    return _from_meta(meta, scales, meta["pool"])
+
+
+class _ColumnView(dict):
+    # Field access like a structured array (view["x"], len(view), view[mask]) over separate columns
+
+    def __len__(self):
+        return len(next(iter(self.values()))) if dict.__len__(self) else 0
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return dict.__getitem__(self, key)
+        return _ColumnView({name: values[key] for name, values in self.items()})
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self.values())
@@ -1,35 +1,51 @@
 import numpy as np
 from scipy.stats import norm
-from svgwrite import Drawing, rgb
+from svgwrite import rgb
+from tick_table import TickTableBuilder, table_to_svg
 import math
 
-def generate_enhanced_stat_slide_rule(output_file="enhanced_slide_rule_fixed.svg"):
+# === CONFIGURABLE DEFAULTS: any key can be overridden by passing a spec dict ===
+Z_RULE_DEFAULTS = {
+    "width": 1800,
+    "height": 600,
+    "margin": 80,
+    "z_max": 3.5,          # right end of the z scale
+    "compress_from": 2.0,  # z beyond this is log-compressed
+}
+
+
+def build_enhanced_stat_tick_table(spec=None):
+    # Builds the whole rule as a TickTable from spec only: no globals, no printing, no file access
+    spec = {**Z_RULE_DEFAULTS, **(spec or {})}
     # Configuration
-    width, height = 1800, 600
-    margin = 80
+    width, height = spec["width"], spec["height"]
+    margin = spec["margin"]
     rule_width = width - 2 * margin
 
     # Focus on positive half only
-    z_min, z_max = 0, 3.5
+    z_min, z_max = 0, spec["z_max"]
+    compress_from = spec["compress_from"]
+    if not 0 < compress_from < z_max:
+        raise ValueError(f"Need 0 < compress_from < z_max, got compress_from={compress_from}, z_max={z_max}")
     p_min = norm.cdf(z_min)  # 0.5
     p_max = norm.cdf(z_max)  # ~0.9998
 
-    # Create SVG drawing
-    dwg = Drawing(output_file, size=(width, height), profile='full')
+    # Collect ticks and labels in a columnar tick table
+    table = TickTableBuilder(width, height)
 
     # Draw background
-    dwg.add(dwg.rect(insert=(0, 0), size=(width, height), fill=rgb(248, 248, 240)))
+    table.add_decor("rect", insert=(0, 0), size=(width, height), fill=rgb(248, 248, 240))
 
     # Core transformation function (fixed remaining_width calculation)
     def z_to_position(z):
-        if z <= 2.0:
+        if z <= compress_from:
             return margin + rule_width * (z - z_min) / (z_max - z_min)
         else:
-            base_pos = margin + rule_width * (2.0 - z_min) / (z_max - z_min)
+            base_pos = margin + rule_width * (compress_from - z_min) / (z_max - z_min)
             right_end = margin + rule_width  # = width - margin
             remaining_width = right_end - base_pos
-            # Log compress beyond z=2.0
-            log_factor = math.log(1 + (z - 2.0)) / math.log(1 + (z_max - 2.0))
+            # Log compress beyond z=compress_from
+            log_factor = math.log(1 + (z - compress_from)) / math.log(1 + (z_max - compress_from))
             return base_pos + remaining_width * log_factor
 
     # Draw the rules with optimized vertical distance
@@ -37,16 +53,14 @@ def generate_enhanced_stat_slide_rule(output_file="enhanced_slide_rule_fixed.svg
     rule_color = rgb(40, 40, 40)
 
     # Draw the rule baselines
-    dwg.add(dwg.line(start=(margin, rule_y1), end=(width - margin, rule_y1),
-                     stroke=rule_color, stroke_width=2))
-    dwg.add(dwg.line(start=(margin, rule_y2), end=(width - margin, rule_y2),
-                     stroke=rule_color, stroke_width=2))
+    table.add_decor("line", start=(margin, rule_y1), end=(width - margin, rule_y1),
+                    stroke=rule_color, stroke_width=2)
+    table.add_decor("line", start=(margin, rule_y2), end=(width - margin, rule_y2),
+                    stroke=rule_color, stroke_width=2)
 
     # Add scale labels with smaller font (8px)
-    dwg.add(dwg.text("Z-Score", insert=(width/2, rule_y1 - 30), text_anchor="middle",
-                     font_size=8, font_family="Arial", fill=rgb(0, 0, 0)))
-    dwg.add(dwg.text("Probability", insert=(width/2, rule_y2 + 35), text_anchor="middle",
-                     font_size=8, font_family="Arial", fill=rgb(0, 0, 0)))
+    table.add_label("z", "Z-Score", width/2, rule_y1 - 30, 8, rgb(0, 0, 0))
+    table.add_label("p", "Probability", width/2, rule_y2 + 35, 8, rgb(0, 0, 0))
 
     # --------- Helper: robust tick/label generation ----------
     def generate_ticks(scale_type, values, tick_sizes, stroke_widths, is_z_scale=True, label_values=None):
@@ -75,9 +89,7 @@ def generate_enhanced_stat_slide_rule(output_file="enhanced_slide_rule_fixed.svg
             # draw tick mark
             tick_size = tick_sizes[i]
             stroke_width = stroke_widths[i]
-            dwg.add(dwg.line(start=(x_pos, y_base),
-                             end=(x_pos, y_base + direction * tick_size),
-                             stroke=rule_color, stroke_width=stroke_width))
+            tick = table.add_tick(scale_type, x_pos, y_base, direction * tick_size, rule_color, stroke_width)
 
             # Add label only for requested rounded values and avoid overlap
             if label_set and round(value, label_round) in label_set:
@@ -102,8 +114,7 @@ def generate_enhanced_stat_slide_rule(output_file="enhanced_slide_rule_fixed.svg
                             font_size = 10
                             y_text = y_base + direction * (tick_size + 18)
 
-                        dwg.add(dwg.text(label, insert=(x_pos, y_text), text_anchor="middle",
-                                         font_size=font_size, font_family="Arial", fill=rgb(0, 0, 0)))
+                        table.add_label(scale_type, label, x_pos, y_text, font_size, rgb(0, 0, 0), tick=tick)
                         last_label_pos = x_pos
 
                     else:
@@ -117,37 +128,35 @@ def generate_enhanced_stat_slide_rule(output_file="enhanced_slide_rule_fixed.svg
                             label = f"{value:.4f}"[1:]
                         font_size = 10
                         y_text = y_base + direction * (tick_size + 30)
-                        text = dwg.text(label, insert=(x_pos, y_text), text_anchor="middle",
-                                        font_size=font_size, font_family="Arial", fill=rgb(0, 0, 0))
                         # rotate around insertion point (x_pos, y_text)
-                        text.rotate(90, (x_pos, y_text))
-                        dwg.add(text)
+                        table.add_label(scale_type, label, x_pos, y_text, font_size, rgb(0, 0, 0),
+                                        rotation=90, tick=tick)
                         last_label_pos = x_pos
 
     # ---------------- Z scale ticks ----------------
     # Build a rounded set of z-values to avoid float equality issues
     set_z = set()
     # Major ticks
-    major_z = [0.0, 1.0, 2.0, 3.0, 3.5]
+    major_z = [float(z) for z in range(0, int(z_max) + 1)] + [z_max]
     for z in major_z:
         set_z.add(round(z, 2))
     # decimal ticks .1 increments
-    for integer in range(0, 4):
+    for integer in range(0, int(z_max) + 1):
         for d in range(1, 10):
             z = round(integer + d/10.0, 2)
-            if z <= 3.5:
+            if z <= z_max:
                 set_z.add(z)
     # 0.05 ticks
-    steps_005 = int(3.5 / 0.05) + 1
+    steps_005 = int(z_max / 0.05) + 1
     for i in range(steps_005 + 1):
         z = round(i * 0.05, 2)
-        if z <= 3.5:
+        if z <= z_max:
             set_z.add(z)
     # 0.01 ticks
-    steps_001 = int(3.5 / 0.01) + 1
+    steps_001 = int(z_max / 0.01) + 1
     for i in range(steps_001 + 1):
         z = round(i * 0.01, 2)
-        if z <= 3.5:
+        if z <= z_max:
             set_z.add(z)
 
     z_values = sorted(set_z)
@@ -174,13 +183,8 @@ def generate_enhanced_stat_slide_rule(output_file="enhanced_slide_rule_fixed.svg
             z_stroke_widths.append(0.5)
 
     # Labels we want on z-scale (rounded)
-    z_label_values = [
-        0, 1.0, 2.0, 3.0, 3.5,
-        0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9,
-        1.1, 1.2, 1.3, 1.4, 1.5, 1.6, 1.7, 1.8, 1.9,
-        2.1, 2.2, 2.3, 2.4, 2.5, 2.6, 2.7, 2.8, 2.9,
-        3.1, 3.2, 3.3, 3.4
-    ]
+    # Every 0.1 step plus the right end of the scale
+    z_label_values = [i / 10.0 for i in range(0, int(round(z_max * 10)))] + [z_max]
     z_label_values = sorted(set(round(v, 2) for v in z_label_values))
 
     generate_ticks("z", z_values, z_tick_sizes, z_stroke_widths, is_z_scale=True, label_values=z_label_values)
@@ -214,7 +218,8 @@ def generate_enhanced_stat_slide_rule(output_file="enhanced_slide_rule_fixed.svg
             if p < end:
                 p_values_set.add(round(p, 6))
 
-    p_values = sorted(p_values_set)
+    # Only p values whose z lands on the rule (p_max = cdf(z_max))
+    p_values = sorted(p for p in p_values_set if p <= p_max)
 
     # Build p tick sizes (major vs minor)
     p_tick_sizes = []
@@ -232,41 +237,46 @@ def generate_enhanced_stat_slide_rule(output_file="enhanced_slide_rule_fixed.svg
     generate_ticks("p", p_values, p_tick_sizes, p_stroke_widths, is_z_scale=False, label_values=major_p)
 
     # Add subtle grid lines at major intervals
-    for z in [1.0, 2.0, 3.0]:
+    for z in [float(z) for z in range(1, int(z_max) + 1) if z < z_max]:
         x_pos = z_to_position(z)
-        dwg.add(dwg.line(start=(x_pos, rule_y1 - 15), end=(x_pos, rule_y2 + 15),
-                         stroke=rgb(230, 230, 230), stroke_width=1, stroke_dasharray="3,3"))
+        table.add_decor("line", start=(x_pos, rule_y1 - 15), end=(x_pos, rule_y2 + 15),
+                        stroke=rgb(230, 230, 230), stroke_width=1, stroke_dasharray="3,3")
 
     # Add region indicators
-    dwg.add(dwg.text(".", insert=(margin + rule_width*0.25, rule_y2 + 55),
-                     text_anchor="middle", font_size=11,
-                     font_family="Arial", fill=rgb(120, 120, 120)))
-
-    dwg.add(dwg.text(".", insert=(margin + rule_width*0.75, rule_y2 + 55),
-                     text_anchor="middle", font_size=11,
-                     font_family="Arial", fill=rgb(120, 120, 120)))
+    table.add_label("title", ".", margin + rule_width*0.25, rule_y2 + 55, 11, rgb(120, 120, 120))
+    table.add_label("title", ".", margin + rule_width*0.75, rule_y2 + 55, 11, rgb(120, 120, 120))
 
     # Add decorative bounding box
-    rule_box = dwg.rect(insert=(margin-10, rule_y1-25), size=(rule_width+20, rule_y2-rule_y1+50),
-                        fill="none", stroke=rgb(200, 200, 200), stroke_width=1.5, rx=6, ry=6)
-    dwg.add(rule_box)
+    table.add_decor("rect", insert=(margin-10, rule_y1-25), size=(rule_width+20, rule_y2-rule_y1+50),
+                    fill="none", stroke=rgb(200, 200, 200), stroke_width=1.5, rx=6, ry=6)
 
     # Add clean title and information
-    dwg.add(dwg.text("High-Detail Statistical Slide Rule",
-                     insert=(width/2, 60), text_anchor="middle",
-                     font_size=18, font_family="Arial", font_weight="bold", fill=rgb(0, 0, 0)))
-
-    dwg.add(dwg.text("Z-Score to Probability Conversion (Normal Distribution)",
-                     insert=(width/2, 90), text_anchor="middle",
-                     font_size=12, font_family="Arial", fill=rgb(100, 100, 100)))
+    table.add_label("title", "High-Detail Statistical Slide Rule", width/2, 60, 18, rgb(0, 0, 0),
+                    font_weight="bold")
+    table.add_label("title", "Z-Score to Probability Conversion (Normal Distribution)",
+                    width/2, 90, 12, rgb(100, 100, 100))
 
     # Add measurement guide marks at the ends
     for x in [margin, width - margin]:
-        dwg.add(dwg.line(start=(x, rule_y1 - 8), end=(x, rule_y2 + 8),
-                         stroke=rgb(120, 120, 120), stroke_width=1.5))
+        table.add_decor("line", start=(x, rule_y1 - 8), end=(x, rule_y2 + 8),
+                        stroke=rgb(120, 120, 120), stroke_width=1.5)
+
+    return table.build()
+
+
+def render_enhanced_stat_slide_rule(spec=None):
+    # Pure and reentrant: returns the SVG document as bytes, safe to call from many threads
+    return table_to_svg(build_enhanced_stat_tick_table(spec))
+
+
+def write_enhanced_stat_slide_rule(stream, spec=None):
+    # Writes the SVG to any binary stream (file, socket, BytesIO, HTTP response body)
+    stream.write(render_enhanced_stat_slide_rule(spec))
+
 
-    # Save the SVG
-    dwg.save()
+def generate_enhanced_stat_slide_rule(output_file="enhanced_slide_rule_fixed.svg", spec=None):
+    with open(output_file, "wb") as f:
+        write_enhanced_stat_slide_rule(f, spec)
     print(f"High-detail slide rule saved as {output_file}")
     print("Fixes applied:")
     print("- Robust float-handling for labels (rounded membership checks)")